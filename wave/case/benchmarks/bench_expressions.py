@@ -0,0 +1,95 @@
+if __name__ == "__main__":
+    import sys, os
+    # add parent directory to path
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import ergogen
+
+CASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIGS = [
+    os.path.join(CASE_DIR, 'ergogen', 'wave.yml'),
+    os.path.join(CASE_DIR, 'ergogen', 'snap_fit.yml'),
+    os.path.join(CASE_DIR, '..', '..', 'particle', 'case', 'config', 'duality_keyboard.yaml'),
+]
+
+def startup_time(module: str, repeat: int = 5) -> float:
+    """Best wall time of importing a module in a fresh interpreter."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', f'import {module}'], cwd=CASE_DIR, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def collect_expressions(config: Any) -> list[str]:
+    """All scalar string leaves of a config - a superset of what gets evaluated."""
+    found = []
+    def walk(value):
+        if isinstance(value, dict):
+            for v in value.values():
+                walk(v)
+        elif isinstance(value, list):
+            for v in value:
+                walk(v)
+        elif isinstance(value, str):
+            found.append(value)
+    walk(config)
+    return found
+
+def evaluate_with_sympy(expr: str, units: Dict[str, float]) -> float | None:
+    """The former evaluation path: a full sympy parse per call."""
+    import sympy
+    try:
+        return float(sympy.parse_expr(expr, transformations='all', local_dict=units))
+    except Exception:
+        return None
+
+def evaluate_builtin(expr: str, units: Dict[str, float]) -> float | None:
+    try:
+        return float(ergogen.compile_expression(expr)(units))
+    except Exception:
+        return None
+
+def time_evaluation(evaluate: Callable[[str, Dict[str, float]], float | None], exprs: list[str], units: Dict[str, float], repeat: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        evaluated = sum(1 for e in exprs if evaluate(e, units) is not None)
+    return (time.perf_counter() - start) / repeat, evaluated
+
+def main(repeat: int = 20):
+    print("Startup (fresh interpreter, best of 5):")
+    print(f"  import expressions: {startup_time('expressions')*1000:8.1f} ms")
+    print(f"  import sympy:       {startup_time('sympy')*1000:8.1f} ms")
+
+    # startup is measured above, keep the import out of the evaluation numbers
+    import sympy
+
+    print("\nEvaluation per config (all string leaves, mean per pass):")
+    for path in CONFIGS:
+        config = ergogen.load_config(path)
+        units = ergogen.parse_units(config)
+        exprs = collect_expressions(config)
+
+        ergogen.compile_expression.cache_clear()
+        cold, _ = time_evaluation(evaluate_builtin, exprs, units, 1)
+        warm, builtin_count = time_evaluation(evaluate_builtin, exprs, units, repeat)
+        sympy_time, sympy_count = time_evaluation(evaluate_with_sympy, exprs, units, 1)
+
+        print(f"  {os.path.basename(path)}: {len(exprs)} leaves")
+        print(f"    sympy:            {sympy_time*1000:8.2f} ms ({sympy_count} evaluated)")
+        print(f"    built-in (cold):  {cold*1000:8.2f} ms")
+        print(f"    built-in (warm):  {warm*1000:8.2f} ms ({builtin_count} evaluated)")
+
+        start = time.perf_counter()
+        ergogen.get_points(path)
+        print(f"    get_points:       {(time.perf_counter() - start)*1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
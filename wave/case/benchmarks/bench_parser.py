@@ -0,0 +1,162 @@
+if __name__ == "__main__":
+    import sys, os
+    # add parent directory to path
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import yaml
+
+import ergogen
+
+CASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIGS = [
+    os.path.join(CASE_DIR, 'ergogen', 'wave.yml'),
+    os.path.join(CASE_DIR, 'ergogen', 'snap_fit.yml'),
+    os.path.join(CASE_DIR, '..', '..', 'particle', 'case', 'config', 'duality_keyboard.yaml'),
+]
+SYNTHETIC_SIZES = [10, 50, 200, 500, 1000, 2000]
+# kept outside the repository, every machine has its own timings
+HISTORY_FILE = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'duality_keyboard', 'parser_history.json')
+# normalize is ergogen.normalize_config, the single pass get_points uses for dot notation, '$extends' and '$params'
+PIPELINE = ['load', 'normalize', 'units', 'points']
+# the same preprocessing one step at a time, to see which part of normalize got slower;
+# they repeat its work, so they're not part of the total
+NORMALIZE_STAGES = ['unflatten', 'inheritance', 'parameterize']
+STAGES = PIPELINE[:2] + NORMALIZE_STAGES + PIPELINE[2:]
+
+# a stage counts as regressed if it got this much slower than in the previous run,
+# and by more than a minimum so sub-millisecond stages don't report noise
+REGRESSION_THRESHOLD = 1.2
+REGRESSION_MIN_MS = 0.5
+
+def synthetic_config(keys: int) -> str:
+    """YAML for a layout with roughly the given number of keys.
+    Zones of up to 10x5 keys are chained through anchor refs, and the config uses dot notation,
+    '$extends' and '$params' so that every preprocessing stage has work to do."""
+    rows = min(5, keys)
+    per_zone = min(keys, 50)
+    zone_count = math.ceil(keys / per_zone)
+    cols = math.ceil(per_zone / rows)
+
+    template = {
+        '$params': ['__splay'],
+        'key.spread': 'spread',
+        'columns': {f'c{c}': {'key.stagger': f'{(c % 3) * 0.1}u', 'key.splay': '__splay' if c else 0} for c in range(cols)},
+        'rows': {f'r{r}': {} for r in range(rows)},
+    }
+    zones: Dict[str, Any] = {'template': template}
+    for z in range(zone_count):
+        zone = {'$extends': 'points.zones.template', '$args': [z % 3 - 1]}
+        if z:
+            zone['anchor'] = {'ref': f'zone{z - 1}_c0_r0', 'shift': [0, f'-{rows + 1}u']}
+        zones[f'zone{z}'] = zone
+
+    config = {
+        'units': {'spread': 'u + 0.5'},
+        'points': {'rotate': 2, 'zones': zones},
+    }
+    return yaml.safe_dump(config, sort_keys=False)
+
+def run_stages(path: str) -> tuple[Dict[str, float], int]:
+    """Time each stage of get_points once, plus the single steps of normalize.
+    Returns the timings and the number of points."""
+    timings: Dict[str, float] = {}
+
+    def timed(stage: str, fn: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    loaded = timed('load', lambda: ergogen.load_config(path))
+    config = timed('normalize', lambda: ergogen.normalize_config(loaded))
+    unflattened = timed('unflatten', lambda: ergogen.unflatten_dot_notation(loaded))
+    inherited = timed('inheritance', lambda: ergogen.handle_inheritance(unflattened))
+    timed('parameterize', lambda: ergogen.parameterize(inherited))
+    units = timed('units', lambda: ergogen.parse_units(config))
+    points = timed('points', lambda: ergogen.parse_points(config.get('points', {}), units))
+    return timings, len(points)
+
+def benchmark(path: str, repeat: int) -> Dict[str, Any]:
+    """Best time per stage over several runs."""
+    best = {stage: float('inf') for stage in STAGES}
+    for _ in range(repeat):
+        timings, count = run_stages(path)
+        best = {stage: min(best[stage], timings[stage]) for stage in STAGES}
+    best_ms = {stage: round(t * 1000, 4) for stage, t in best.items()}
+    return {'points': count, 'stages_ms': best_ms, 'total_ms': round(sum(best_ms[stage] for stage in PIPELINE), 4)}
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=CASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path: str) -> list[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def report_regressions(previous: Dict, current: Dict) -> list[str]:
+    regressions = []
+    for name, result in current['results'].items():
+        before = previous['results'].get(name)
+        if before is None:
+            continue
+        for stage, ms in result['stages_ms'].items():
+            old = before['stages_ms'].get(stage)
+            if old and ms > old * REGRESSION_THRESHOLD and ms - old > REGRESSION_MIN_MS:
+                regressions.append(f"{name} {stage}: {old:.2f} ms -> {ms:.2f} ms")
+    return regressions
+
+def main(repeat: int = 5, sizes: list[int] = SYNTHETIC_SIZES, history_file: str = HISTORY_FILE):
+    import tempfile
+
+    results: Dict[str, Dict] = {}
+    for path in CONFIGS:
+        results[os.path.basename(path)] = benchmark(path, repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f'synthetic_{size}.yml')
+            with open(path, 'w') as f:
+                f.write(synthetic_config(size))
+            results[f'synthetic_{size}'] = benchmark(path, repeat)
+
+    print(f"{'config':<28}{'points':>7}" + ''.join(f'{stage:>14}' for stage in STAGES) + f"{'total':>12}")
+    for name, result in results.items():
+        stages = ''.join(f"{result['stages_ms'][stage]:>11.2f} ms" for stage in STAGES)
+        print(f"{name:<28}{result['points']:>7}{stages}{result['total_ms']:>9.2f} ms")
+
+    entry = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'results': results,
+    }
+    history = load_history(history_file)
+    if history:
+        regressions = report_regressions(history[-1], entry)
+        print(f"\nCompared to {history[-1]['revision']} ({history[-1]['timestamp']}):")
+        print('\n'.join(f"  slower: {r}" for r in regressions) if regressions else "  no regressions")
+    history.append(entry)
+    os.makedirs(os.path.dirname(os.path.abspath(history_file)), exist_ok=True)
+    with open(history_file, 'w') as f:
+        json.dump(history, f, indent=2)
+    print(f"\nAppended results to {history_file}")
+
+
+if __name__ == "__main__":
+    main()
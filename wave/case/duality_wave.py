@@ -19,6 +19,7 @@ from models.model_types import RoundDimensions, PosAndDims, RectDimensions, Wave
 from ocp_vscode import *
 
 from models.outline import Outline
+from part_cache import PartCache
 
 
 @dataclass
@@ -108,7 +109,7 @@ if __name__ == "__main__":
     keys = ErgoKeys(points=points)
     outline = Outline(switch=switch, keys=keys, wall_thickness=CaseDimensions.wall_thickness)
     dims = CaseDimensions(switch=switch, outline=outline, keys=keys)
-    case = WaveCase(switch=switch, keys=keys, caseDimensions=dims, outline=outline, debug=True, both_sides=False)
+    case = WaveCase(switch=switch, keys=keys, caseDimensions=dims, outline=outline, debug=True, both_sides=False, part_cache=PartCache(verbose=True))
     show_clear()
     set_defaults(ortho=True, default_edgecolor="#121212", reset_camera=Camera.KEEP)
     set_colormap(ColorMap.seeded(colormap="rgb", alpha=1, seed_value="wave"))
@@ -1,66 +1,104 @@
 from itertools import groupby
-import json
 from ocp_vscode import *
 
 
 import yaml
-import sympy
+import expressions
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from build123d import *
 from typing import Callable, Dict, List, Any
 import re
-from copy import copy
-
-
-@dataclass
+import sys
+from functools import lru_cache
+import numpy as np
+
+
+@dataclass(slots=True, eq=False)
+class Zone:
+    """A zone's name and config, held once and shared by all keys of the zone."""
+    name: str
+    config: Dict = field(repr=False)
+
+@dataclass(slots=True)
+class KeyMeta:
+    """The resolved fields of a key that are needed after layout. Everything else is in the zone config."""
+    name: str
+    zone: Zone
+    column: str
+    row: str
+    width: float
+    height: float
+    skip: bool = False
+    asym: str = 'both'
+    # None until a mirror pass has seen the key, then whether it is the mirrored copy
+    mirrored: bool | None = None
+
+    @property
+    def col(self) -> Dict:
+        return self.zone.config['columns'][self.column]
+
+@dataclass(slots=True)
 class Point:
-    p: Vector = Vector(0, 0) 
+    p: Vector = Vector(0, 0)
     r: float = 0
-    meta: dict = field(default_factory=dict)
+    meta: KeyMeta | None = None
 
 def load_config(config_path: str) -> Dict:
     """Load the ergogen YAML config."""
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
+NUMBER_LITERAL = re.compile(r'\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*')
+
+@lru_cache(maxsize=None)
+def compile_expression(expr: str) -> expressions.Compiled | None:
+    """Compile an expression with the built-in evaluator, or return None if its grammar doesn't cover it."""
+    try:
+        return expressions.compile_expression(expr)
+    except expressions.ExpressionError:
+        return None
+
+@lru_cache(maxsize=None)
+def compile_sympy_expression(expr: str, names: frozenset[str]) -> tuple[tuple[str, ...], Callable[..., float]] | None:
+    """Parse an expression once with sympy and compile it into a callable over the unit names it uses.
+    The names are part of the cache key because sympy's symbol splitting depends on them:
+    `1kx` is `1*kx` if `kx` is a unit, but `1*k*x` otherwise.
+    Returns None if the expression can't be compiled to a number.
+    """
+    # sympy is slow to import and only needed for expressions the built-in evaluator can't handle
+    import sympy
+
+    symbols = {name: sympy.Symbol(name) for name in names}
+    try:
+        parsed = sympy.parse_expr(expr, transformations='all', local_dict=symbols)
+        free = sorted(str(s) for s in parsed.free_symbols)
+        if not set(free) <= names:
+            return None
+        return tuple(free), sympy.lambdify([symbols[name] for name in free], parsed, 'math')
+    except Exception:
+        return None
+
 def evaluate_expression(expr: any, context: Dict[str, float]) -> float:
+    if isinstance(expr, (int, float)) and not isinstance(expr, bool):
+        return float(expr)
+    s = str(expr)
+    if NUMBER_LITERAL.fullmatch(s):
+        return float(s)
+
     try:
-        return float(sympy.parse_expr(str(expr), transformations='all', local_dict=context))
+        if (compiled := compile_expression(s)) is not None:
+            try:
+                return float(compiled(context))
+            except KeyError:
+                # unknown name - sympy might still split it into known units
+                pass
+        free, fn = compile_sympy_expression(s, frozenset(name for name in context if name in s))
+        return float(fn(*[context[name] for name in free]))
     except:
-        print(f"Could not evaluate expression '{expr}' with sympy, returning as is")
+        print(f"Could not evaluate expression '{expr}', returning as is")
         return expr
 
-def visit_all(d: Dict | list, visitor: Callable[[dict|list, str, any], any], path: list[str] = [], complete_dict: Dict | None = None) -> None:
-    """Recursively visit all keys in a nested dictionary or list, applying the visitor function.
-    The visitor function will be called with 
-    - the new dictionary or list being built,
-    - the current key and entry,
-    - the value to be set (can be None)
-    - the path to the current key as a list of strings
-    - the complete dictionary before the traversal begun
-    """
-    if complete_dict is None:
-        complete_dict = d
-
-    if isinstance(d, dict):
-        result = {}
-        for key, value in d.items():
-            path.append(key)
-            visitor(result, key, visit_all(value, visitor, path, complete_dict), path, complete_dict)
-            path.pop()
-        return result
-    elif isinstance(d, list):
-        result = []
-        dummy = {}
-        for index, value in enumerate(d):
-            path.append(str(index))
-            visitor(dummy, 'dummykey', visit_all(value, visitor, path, complete_dict), path, complete_dict)
-            result.append(dummy.get('dummykey', None))
-            path.pop()
-        return result
-    return d
-
 def get_nested_value(d: Dict, path: str, default: Any = None) -> Any:
     """Get a nested value from a dictionary using a list of keys."""
     keys = path.split('.')
@@ -72,82 +110,208 @@ def get_nested_value(d: Dict, path: str, default: Any = None) -> Any:
             return default
     return current
 
-def set_nested_value(d: Dict, path: str, value: Any, *_) -> None:
-    """Set a nested value in a dictionary using a list of keys."""
-    if value is None:
-        value = {}
-    keys = path.split('.')
-    current = d
-    for key in keys[:-1]:
-        if key not in current or not isinstance(current[key], dict):
-            current[key] = {}
-        current = current[key]
-    current[keys[-1]] = value
+def as_list(value: Any) -> list:
+    return value if isinstance(value, list) else [value]
+
+UNSET = object()
+
+def extend_value(to: Any, other: Any) -> Any:
+    """Deep-merge other into to, the way ergogen does for '$extends':
+    dicts and lists are merged recursively, everything else is replaced, and '$unset' removes a key.
+    Neither argument is modified; untouched subtrees are shared."""
+    if other is None:
+        return to
+    if isinstance(other, str) and other == '$unset':
+        return UNSET
+    if isinstance(to, dict) and isinstance(other, dict):
+        result = dict(to)
+        for key, value in other.items():
+            merged = extend_value(to.get(key), value)
+            if merged is UNSET:
+                result.pop(key, None)
+            else:
+                result[key] = merged
+        return result
+    if isinstance(to, list) and isinstance(other, list):
+        result = list(to)
+        for index, value in enumerate(other):
+            merged = extend_value(result[index] if index < len(result) else None, value)
+            merged = None if merged is UNSET else merged
+            if index < len(result):
+                result[index] = merged
+            else:
+                result.append(merged)
+        return result
+    return other
+
+def extend(*layers: Dict) -> Dict:
+    """Merge dicts from the most generic to the most specific one."""
+    result = layers[0]
+    for layer in layers[1:]:
+        result = extend_value(result, layer)
+    return result
 
 def unflatten_dot_notation(config: Dict) -> Dict:
-    return visit_all(config, set_nested_value)
+    return normalize_config(config, inherit=False, params=False)
 
 def handle_inheritance(config: Dict) -> Dict:
-    """Handle inheritance in the config by processing 'inherit' keys."""
-    def visitor(d: Dict, key: str, value: Any, path: list[str], complete_dict: Dict) -> None:
-        if isinstance(value, dict) and value.get('$extends', None) is not None:
-            candidates = value.get('$extends')
-            candidates = [candidates] if not isinstance(candidates, list) else candidates
-            merged = [value]
-            while candidates:
-                path = candidates.pop()
-
-                other = get_nested_value(complete_dict, path)
-
-                parents = other.get('$extends', [])
-                parents = [parents] if not isinstance(parents, list) else parents
-                candidates.extend(parents)
-
-                merged.insert(0, other)
-
-            result = {}
-            for d in merged:
-                result.update(d)
-                    
-            del value['$extends']
-        d[key] = value
-
-    return visit_all(config, visitor)
-
+    """Handle inheritance in the config by merging the '$extends' targets into each dict that references them."""
+    return normalize_config(config, expand_dots=False, params=False)
+
+@lru_cache(maxsize=None)
+def compile_params(params: tuple[str, ...]) -> tuple[re.Pattern, ...]:
+    """Compile the '$params' patterns of a template once, no matter how often it's instantiated."""
+    return tuple(re.compile(param) for param in params)
+
+def substitute(value: Any, substitutions: list[tuple[re.Pattern, str]]) -> Any:
+    """Apply the substitutions to all string keys and leaves of a subtree, in order.
+    Unchanged subtrees are returned as they are."""
+    if isinstance(value, str):
+        for pattern, replacement in substitutions:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, dict):
+        result = {substitute(k, substitutions): substitute(v, substitutions) for k, v in value.items()}
+        if all(k is old_k and v is old_v for (k, v), (old_k, old_v) in zip(result.items(), value.items())):
+            return value
+        return result
+    if isinstance(value, list):
+        result = [substitute(item, substitutions) for item in value]
+        return value if all(new is old for new, old in zip(result, value)) else result
+    return value
+
+def apply_params(value: Dict) -> Dict | None:
+    """Substitute '$params' with '$args' in a dict.
+    Returns None if the dict should be dropped: it's marked '$skip', or it's a template with only one of the two."""
+    if value.get('$skip', False):
+        return None
+
+    params = value.get('$params', None)
+    args = value.get('$args', None)
+    if params is None and args is None:
+        return value
+    if params is None or args is None:
+        return None
+
+    patterns = compile_params(tuple(str(param) for param in as_list(params)))
+    substitutions = list(zip(patterns, [str(arg) for arg in as_list(args)]))
+    return substitute({k: v for k, v in value.items() if k not in ('$params', '$args')}, substitutions)
 
 def parameterize(config: Dict) -> Dict:
-    """Parameterize the config by evaluating all string expressions."""   
-    def visitor(d: Dict, key: str, value: Any, path: list[str], complete_dict: Dict) -> None:
-        if not isinstance(value, Dict):
-            d[key] = value
-            return
-
-        if value.get('$skip', False):
-            return
-
-        params = value.get('$params', None)
-        args = value.get('$args', None)       
-        if params is None and args is None:
-            d[key] = value
-            return
-        if params is not None and args is None:
-            return
-        if params is None and args is not None:
-            return
-
-        params = [params] if not isinstance(params, list) else params
-        args = [args] if not isinstance(args, list) else args
-
-        value: str = json.dumps(value)
-        for pattern, replacement in zip(params, args):
-            value = re.sub(rf"{pattern}", replacement, value)
-        value = json.loads(value)
+    """Parameterize the config by substituting '$params' with '$args'."""
+    return normalize_config(config, expand_dots=False, inherit=False)
+
+def expand_dot_notation(d: Dict) -> Dict:
+    """Expand the dotted keys of a single dict level, e.g. {'a.b': 1} becomes {'a': {'b': 1}}.
+    Returns the dict itself if there's nothing to expand. Neither the dict nor its values are modified."""
+    if not any(isinstance(key, str) and '.' in key for key in d):
+        return d
+
+    result = {}
+    created = set()  # ids of the dicts created here - only these may be modified in place
+    for key, value in d.items():
+        if not (isinstance(key, str) and '.' in key):
+            result[key] = value
+            continue
+        *parents, last = key.split('.')
+        current = result
+        for k in parents:
+            child = current.get(k)
+            if not isinstance(child, dict):
+                child = {}
+                created.add(id(child))
+            elif id(child) not in created:
+                child = dict(child)
+                created.add(id(child))
+            current[k] = child
+            current = child
+        current[last] = value
+    return result
+
+def normalize_config(config: Dict, expand_dots: bool = True, inherit: bool = True, params: bool = True) -> Dict:
+    """Expand dot notation, resolve '$extends' and apply '$params'/'$args' in a single traversal.
+    Each stage can be switched off, which is how the individual stage functions are implemented.
+    Subtrees that don't change are shared with the input instead of being copied.
+
+    Every node is resolved at most once: '$extends' targets are memoized, so a base template is
+    processed once no matter how many dicts extend it, and a cyclic chain raises a ValueError.
+    """
+    expanded: Dict[int, Dict] = {}
+    # id of an input container -> its normalized and inherited (but not yet parameterized) form
+    resolved: Dict[int, Any] = {}
+    # names of the nodes currently being resolved, to report cycles
+    in_progress: Dict[int, str] = {}
+
+    def expand(d: Dict) -> Dict:
+        if not expand_dots:
+            return d
+        if id(d) not in expanded:
+            expanded[id(d)] = expand_dot_notation(d)
+        return expanded[id(d)]
+
+    def lookup(path: str) -> Any:
+        current = config
+        for key in path.split('.'):
+            if not isinstance(current, dict) or key not in expand(current):
+                return None
+            current = expand(current)[key]
+        return current
 
-        del value['$params']
-        del value['$args']
-        d[key] = value
+    def resolve(value: Any, name: str) -> Any:
+        if not isinstance(value, (dict, list)):
+            return value
+        if id(value) in resolved:
+            return resolved[id(value)]
+        if id(value) in in_progress:
+            chain = list(in_progress.values())
+            chain = chain[chain.index(in_progress[id(value)]):] + [name]
+            raise ValueError(f"Cyclic '$extends': {' -> '.join(chain)}")
+
+        in_progress[id(value)] = name
+        try:
+            result = normalize(value, name)
+            if inherit and isinstance(result, dict) and result.get('$extends', None) is not None:
+                parents = []
+                for path in as_list(result['$extends']):
+                    other = lookup(path)
+                    if not isinstance(other, dict):
+                        raise ValueError(f"'{path}' (extended by '{name}') is not a valid inheritance target")
+                    parents.append(resolve(other, path))
+                result = extend(*parents, {k: v for k, v in result.items() if k != '$extends'})
+        finally:
+            del in_progress[id(value)]
+
+        resolved[id(value)] = result
+        return result
 
-    return visit_all(config, visitor)
+    def normalize_child(value: Any, name: str) -> Any | None:
+        """Normalize a dict or list entry, returning None if it should be dropped."""
+        if value is None:
+            return {} if expand_dots else None
+        value = resolve(value, name)
+        if params and isinstance(value, dict):
+            value = apply_params(value)
+        return value
+
+    def normalize(value: Any, name: str) -> Any:
+        if isinstance(value, dict):
+            source = expand(value)
+            changed = source is not value
+            result = {}
+            for key, child in source.items():
+                new = normalize_child(child, f"{name}.{key}" if name else str(key))
+                changed |= new is not child
+                if new is not None or child is None:
+                    result[key] = new
+            return result if changed else value
+        if isinstance(value, list):
+            result = [normalize_child(item, f"{name}[{index}]") for index, item in enumerate(value)]
+            if all(new is old for new, old in zip(result, value)):
+                return value
+            return [new for new, old in zip(result, value) if new is not None or old is None]
+        return value
+
+    return normalize(config, '')
 
 
 def parse_units(config: Dict) -> Dict[str, float]:
@@ -172,77 +336,79 @@ def parse_units(config: Dict) -> Dict[str, float]:
         units[key] = evaluate_expression(val, units)
     return units
 
+TEMPLATE = re.compile(r'\{\{([^}]*)\}\}')
+
+@lru_cache(maxsize=None)
+def compile_template(s: str) -> tuple[str, ...]:
+    """Split a template into alternating literal parts and value paths. A single part means no placeholders."""
+    return tuple(TEMPLATE.split(s))
+
 def template(s: str, vals: Dict) -> str:
-    def replacer(match):
-        return str(get_nested_value(vals, match.group(1)) or '')
-    regex = re.compile(r'\{\{([^}]*)\}\}')
-    return regex.sub(replacer, s)
-
-def render_zone(zone_name: str, zone: Dict, anchor: Point, global_key: Dict, units: Dict[str, float]) -> Dict[str, Point]:
-    """Render a zone and return the generated points."""
-    cols = zone.get('columns', {})
+    parts = compile_template(s)
+    if len(parts) == 1:
+        return s
+    return ''.join(part if i % 2 == 0 else str(get_nested_value(vals, part) or '') for i, part in enumerate(parts))
+
+# key fields that are evaluated as expressions, and those that are evaluated as vectors
+NUMERIC_FIELDS = ('stagger', 'spread', 'splay', 'orient', 'rotate', 'width', 'height', 'padding')
+VECTOR_FIELDS = ('origin', 'shift')
+
+def zone_columns(zone_name: str, zone: Dict, global_key: Dict, units: Dict[str, float]) -> list[list[Dict]]:
+    """Resolve the key config of every key in a zone, grouped by column.
+    The default, global, zone and column layers are merged and evaluated once per column,
+    so a row only costs a shallow merge of its own overrides."""
+    # named copies, so that laying out a zone never modifies the config it came from
+    cols = {col_name: {**col, 'name': col_name} for col_name, col in (zone.get('columns') or {'default': {}}).items()}
+    zone = {**zone, 'name': zone_name, 'columns': cols}
     zone_wide_rows: Dict[str, Any] = zone.get('rows', {})
     zone_wide_key = zone.get('key', {})
 
-    # algorithm prep
-    points: Dict[str, Point] = {}
-    rotations: List[Point] = []
-
-    zone_anchor = copy(anchor)
-    # transferring the anchor rotation to "real" rotations
-    rotations.append(zone_anchor)
-    # and now clear it from the anchor so that we don't apply it twice
-    zone_anchor = Point(p=zone_anchor.p)
-    
-    # column layout
-    if len(cols.keys()) == 0:
-        cols['default'] = {}
-    first_col = True
+    default_key = {
+        'stagger': units['$default_stagger'],
+        'spread': units['$default_spread'],
+        'splay': units['$default_splay'],
+        'origin': [0, 0],
+        'orient': 0,
+        'shift': [0, 0],
+        'rotate': 0,
+        'adjust': {},
+        'width': units['$default_width'],
+        'height': units['$default_height'],
+        'padding': units['$default_padding'],
+        'autobind': units['$default_autobind'],
+        'skip': False,
+        'asym': 'both',
+        'colrow': '{{col.name}}_{{row}}',
+        'name': '{{zone.name}}_{{colrow}}'
+    }
+    columns = []
     for col_name, col in cols.items():
         # combining row data from zone-wide defs and col-specific defs
-        actual_rows = list({**zone_wide_rows, **col.get('rows', {})}.keys())
+        col_rows = col.get('rows', {})
+        actual_rows = list({**zone_wide_rows, **col_rows}.keys())
         if not actual_rows:
             actual_rows.append('default')
 
-        # getting key config through the 5-level extension
+        # the first four levels of the 5-level extension are the same for every row of the column
+        column_key = {**default_key, **global_key, **zone_wide_key, **col.get('key', {})}
+        evaluated: Dict[str, Any] = {}
+
+        def column_value(field: str) -> Any:
+            if field not in evaluated:
+                evaluated[field] = evaluate_field(field, column_key[field], units)
+            return evaluated[field]
+
         keys = []
-        default_key = {
-            'stagger': units['$default_stagger'],
-            'spread': units['$default_spread'],
-            'splay': units['$default_splay'],
-            'origin': [0, 0],
-            'orient': 0,
-            'shift': [0, 0],
-            'rotate': 0,
-            'adjust': {},
-            'width': units['$default_width'],
-            'height': units['$default_height'],
-            'padding': units['$default_padding'],
-            'autobind': units['$default_autobind'],
-            'skip': False,
-            'asym': 'both',
-            'colrow': '{{col.name}}_{{row}}',
-            'name': '{{zone.name}}_{{colrow}}'
-        }
         for row in actual_rows:
-            key = {**default_key, **global_key, **zone_wide_key, **col.get('key', {}), **zone_wide_rows.get(row, {}), **col.get('rows', {}).get(row, {})}
+            overrides = {**zone_wide_rows.get(row, {}), **col_rows.get(row, {})}
+            key = {**column_key, **overrides}
 
             key['zone'] = zone
-            key['zone']['name'] = zone_name
             key['col'] = col
-            key['col']['name'] = col_name
             key['row'] = row
 
-            key['stagger'] = evaluate_expression(key['stagger'], units)
-            key['spread'] = evaluate_expression(key['spread'], units)
-            key['splay'] = evaluate_expression(key['splay'], units)
-            key['origin'] = Vector(*[evaluate_expression(v, units) for v in key['origin']])
-            key['orient'] = evaluate_expression(key['orient'], units)
-            key['shift'] = Vector(*[evaluate_expression(v, units) for v in key['shift']])
-            key['rotate'] = evaluate_expression(key['rotate'], units)
-            key['width'] = evaluate_expression(key['width'], units)
-            key['height'] = evaluate_expression(key['height'], units)
-            key['padding'] = evaluate_expression(key['padding'], units)
+            for field in NUMERIC_FIELDS + VECTOR_FIELDS:
+                key[field] = evaluate_field(field, overrides[field], units) if field in overrides else column_value(field)
             key['skip'] = bool(key['skip'])
 
             # templating support
@@ -251,7 +417,64 @@ def render_zone(zone_name: str, zone: Dict, anchor: Point, global_key: Dict, uni
                     key[k] = template(v, key)
 
             keys.append(key)
-        
+        columns.append(keys)
+    return columns
+
+def evaluate_field(field: str, value: Any, units: Dict[str, float]) -> Any:
+    if field in VECTOR_FIELDS:
+        return Vector(*[evaluate_expression(v, units) for v in value])
+    return evaluate_expression(value, units)
+
+def render_zone(zone_name: str, zone: Dict, anchor: Point, global_key: Dict, units: Dict[str, float], backend: str = 'build123d') -> Dict[str, Point]:
+    """Render a zone and return the generated points.
+    The 'numpy' backend lays out whole columns with homogeneous transforms instead of per-key Vector rotations."""
+    columns = zone_columns(zone_name, zone, global_key, units)
+    if backend == 'build123d':
+        points = layout_zone(columns, anchor, units)
+    elif backend == 'numpy':
+        points = layout_zone_numpy(columns, anchor, units)
+    else:
+        raise ValueError(f"Unknown layout backend '{backend}'")
+
+    if columns and columns[0]:
+        shared = Zone(sys.intern(zone_name), columns[0][0]['zone'])
+        for column in columns:
+            for key in column:
+                points[key['name']].meta = key_meta(key, shared)
+    return points
+
+# 'left' and 'right' are aliases of ergogen's 'source' and 'clone'
+ASYM = {'both': 'both', 'source': 'source', 'left': 'source', 'clone': 'clone', 'right': 'clone'}
+
+def key_meta(key: Dict, zone: Zone) -> KeyMeta:
+    """Reduce a resolved key config to its scalar fields, with interned names."""
+    if key['asym'] not in ASYM:
+        raise ValueError(f"Unknown asym '{key['asym']}' for key '{key['name']}', expected one of {list(ASYM)}")
+    return KeyMeta(
+        name=sys.intern(key['name']),
+        zone=zone,
+        column=sys.intern(key['col']['name']),
+        row=sys.intern(str(key['row'])),
+        width=key['width'],
+        height=key['height'],
+        skip=key['skip'],
+        asym=ASYM[key['asym']])
+
+def layout_zone(columns: list[list[Dict]], anchor: Point, units: Dict[str, float]) -> Dict[str, Point]:
+    """Lay out the keys of a zone, column by column."""
+    # algorithm prep
+    points: Dict[str, Point] = {}
+    rotations: List[Point] = []
+
+    zone_anchor = Point(anchor.p, anchor.r)
+    # transferring the anchor rotation to "real" rotations
+    rotations.append(zone_anchor)
+    # and now clear it from the anchor so that we don't apply it twice
+    zone_anchor = Point(p=zone_anchor.p)
+    
+    # column layout
+    first_col = True
+    for keys in columns:
         # setting up column-level anchor without rotation (it's already in the rotations)
         zone_anchor.p += Vector(keys[0]['spread'] if not first_col else 0, keys[0]['stagger'])
         col_anchor = Point(p=zone_anchor.p)
@@ -265,7 +488,7 @@ def render_zone(zone_name: str, zone: Dict, anchor: Point, global_key: Dict, uni
             rotations.append(Point(p=candidate, r=angle))
 
         # actually laying out keys
-        running_anchor = copy(col_anchor)
+        running_anchor = Point(col_anchor.p, col_anchor.r)
 
         for r in rotations:
             running_anchor.p = (running_anchor.p - r.p).rotate(Axis.Z, r.r) + r.p
@@ -273,20 +496,19 @@ def render_zone(zone_name: str, zone: Dict, anchor: Point, global_key: Dict, uni
 
         for key in keys:
             # copy the current column anchor
-            point = copy(running_anchor)
+            point = Point(running_anchor.p, running_anchor.r)
             # apply cumulative per-key adjustments
             point.r += key['orient']
             point.p += key['shift'].rotate(Axis.Z, point.r)
             point.r += key['rotate']
 
             # commit running anchor
-            running_anchor = copy(point)
+            running_anchor = Point(point.p, point.r)
 
             # apply independent adjustments
             point = parse_anchor(key['adjust'], f"{key['name']}.adjust", {}, point, units)
 
-            # save new keyp(key['adjust'],
-            point.meta = key
+            # save new key, render_zone attaches its metadata
             points[key['name']] = point
 
             # advance the running anchor to the next position
@@ -295,12 +517,122 @@ def render_zone(zone_name: str, zone: Dict, anchor: Point, global_key: Dict, uni
         first_col = False
     return points
 
+def rotation_matrix(angle: float, pivot: tuple[float, float] = (0, 0)) -> np.ndarray:
+    """Homogeneous 2D transform rotating by angle degrees (counterclockwise) around pivot."""
+    rad = np.radians(angle)
+    c, s = np.cos(rad), np.sin(rad)
+    x, y = pivot
+    return np.array([
+        [c, -s, x - c*x + s*y],
+        [s, c, y - s*x - c*y],
+        [0, 0, 1],
+    ])
+
+def key_frames(angles: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Stack of homogeneous 2D transforms, one per (angle, position) pair."""
+    rad = np.radians(angles)
+    c, s = np.cos(rad), np.sin(rad)
+    frames = np.zeros((len(angles), 3, 3))
+    frames[:, 0, 0] = c
+    frames[:, 0, 1] = -s
+    frames[:, 1, 0] = s
+    frames[:, 1, 1] = c
+    frames[:, :2, 2] = positions
+    frames[:, 2, 2] = 1
+    return frames
+
+def rotate_vectors(vectors: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    rad = np.radians(angles)
+    c, s = np.cos(rad), np.sin(rad)
+    return np.stack([c*vectors[:, 0] - s*vectors[:, 1], s*vectors[:, 0] + c*vectors[:, 1]], axis=1)
+
+def layout_zone_numpy(columns: list[list[Dict]], anchor: Point, units: Dict[str, float]) -> Dict[str, Point]:
+    """Same layout as layout_zone, but each column is placed with a single batch of matrix products.
+    Splays are accumulated into one zone transform, keys are laid out in the column's own frame,
+    and only the final positions are converted to Points."""
+    points: Dict[str, Point] = {}
+
+    # the zone anchor's rotation and every splay so far, as one transform
+    transform = rotation_matrix(anchor.r, (anchor.p.X, anchor.p.Y))
+    angle = anchor.r
+    position = np.array([anchor.p.X, anchor.p.Y, 1.0])
+
+    for index, keys in enumerate(columns):
+        first = keys[0]
+        position[:2] += (first['spread'] if index else 0, first['stagger'])
+
+        if first['splay']:
+            pivot = transform @ (position + (first['origin'].X, first['origin'].Y, 0))
+            transform = rotation_matrix(first['splay'], (pivot[0], pivot[1])) @ transform
+            angle += first['splay']
+
+        # per-key adjustments in the column frame: each key's orient and rotate carry over to the next ones
+        orient = np.array([key['orient'] for key in keys])
+        rotate = np.array([key['rotate'] for key in keys])
+        shift = np.array([(key['shift'].X, key['shift'].Y) for key in keys])
+        padding = np.array([(0, key['padding']) for key in keys])
+
+        running = np.concatenate(([0], np.cumsum(orient + rotate)[:-1]))
+        key_angles = running + orient + rotate
+        shifts = rotate_vectors(shift, running + orient)
+        paddings = rotate_vectors(padding, key_angles)
+        key_positions = np.cumsum(shifts + paddings, axis=0) - paddings
+
+        column_frame = transform @ np.array([[1, 0, position[0]], [0, 1, position[1]], [0, 0, 1]])
+        world = np.matmul(column_frame, key_frames(key_angles, key_positions))
+
+        for key, frame, key_angle in zip(keys, world, key_angles):
+            point = Point(p=Vector(frame[0, 2], frame[1, 2]), r=angle + key_angle)
+            if key['adjust']:
+                point = parse_anchor(key['adjust'], f"{key['name']}.adjust", {}, point, units)
+            points[key['name']] = point
+
+    return points
+
 def average (parts: list[Point]) -> Point:
         pos_sum: Vector = sum(part.p for part in parts)
         orien_sum = sum(part.r for part in parts)
         return Point(p=pos_sum/len(parts), r=orien_sum/len(parts))
 
-def intersect(parts: list[Point]) -> Point:
+def line_direction(point: Point) -> np.ndarray:
+    """Direction of a point's (rotated) Y axis."""
+    rad = np.radians(point.r)
+    return np.array([-np.sin(rad), np.cos(rad)])
+
+def intersect(parts: list[Point], cross_check: bool = False) -> Point:
+    """Intersect the (rotated) Y axes of the parts.
+    Two lines are intersected in closed form. With more parts, the point closest to all lines
+    in the least-squares sense is returned. Parallel lines raise a ValueError.
+    With cross_check, the result for two parts is verified against the OCCT edge intersection."""
+    if len(parts) < 2:
+        raise ValueError(f"Intersecting needs at least two parts, got {len(parts)}")
+
+    if len(parts) == 2:
+        p1, p2 = (np.array([part.p.X, part.p.Y]) for part in parts)
+        d1, d2 = (line_direction(part) for part in parts)
+        denominator = d1[0]*d2[1] - d1[1]*d2[0]
+        if abs(denominator) < 1e-9:
+            raise ValueError(f"Cannot intersect parallel lines through ({parts[0].p.X}, {parts[0].p.Y}) and ({parts[1].p.X}, {parts[1].p.Y})")
+        delta = p2 - p1
+        t = (delta[0]*d2[1] - delta[1]*d2[0]) / denominator
+        x, y = (p1 + t*d1).tolist()
+    else:
+        # each line is n·x = n·p with n being the line's normal
+        normals = np.array([[-d[1], d[0]] for d in map(line_direction, parts)])
+        offsets = np.array([n @ (part.p.X, part.p.Y) for n, part in zip(normals, parts)])
+        solution, _, rank, _ = np.linalg.lstsq(normals, offsets, rcond=None)
+        if rank < 2:
+            raise ValueError(f"Cannot intersect {len(parts)} parallel lines")
+        x, y = solution.tolist()
+
+    point = Point(p=Vector(x, y))
+    if cross_check and len(parts) == 2:
+        expected = intersect_brep(parts)
+        if (expected.p - point.p).length > 1e-6:
+            raise ValueError(f"Analytic intersection {point.p} differs from OCCT intersection {expected.p}")
+    return point
+
+def intersect_brep(parts: list[Point]) -> Point:
         # // a line is generated from a point by taking their
         # // (rotated) Y axis. The line is not extended to
         # // +/- Infinity as that doesn't work with makerjs.
@@ -310,27 +642,31 @@ def intersect(parts: list[Point]) -> Point:
         def get_line_from_point(point: Point):
             offset = Vector(0, 1000)
             return Line(point.p - offset, point.p + offset)\
-                .rotate(Axis.Z, point.r)
+                .rotate(Axis(point.p, (0, 0, 1)), point.r)
 
         line1 = get_line_from_point(parts[0])
         line2 = get_line_from_point(parts[1])
-        intersection = line1.intersect(line2)[0]
+        intersection = line1.intersect(line2)
+        if isinstance(intersection, (list, tuple)):
+            # older build123d versions return a list of intersections
+            intersection = intersection[0]
         return Point(p=Vector(intersection.X, intersection.Y))
 
 def parse_anchor(raw, name, points: Dict[str, Point] = {}, start: Point = Point(), units: Dict[str, float] = {}) -> Point:
     """Parse an anchor definition and return the resulting Point."""
     if isinstance(raw, list):
-        current = copy(start)
+        current = start
         for index, step in enumerate(raw, start=1):
             current = parse_anchor(step, f"{name}[{index}]", points, current, units)
         return current
 
     raw = {'ref': raw} if isinstance(raw, str) else raw
 
-    point = copy(start)
+    point = Point(start.p, start.r, start.meta)
     if ref := raw.get('ref'):
         if isinstance(ref, str):
-            point = copy(points[ref])
+            ref_point = points[ref]
+            point = Point(ref_point.p, ref_point.r, ref_point.meta)
         else:
             point = parse_anchor(ref, f"{name}.ref", points, start, units)
 
@@ -345,14 +681,17 @@ def parse_anchor(raw, name, points: Dict[str, Point] = {}, start: Point = Point(
         elif method == 'intersect':
             point = intersect(part_points)
 
+    # relative to a mirrored point, x shifts and rotations are mirrored as well unless 'resist' is set
+    flip = -1 if point.meta is not None and point.meta.mirrored and not raw.get('resist') else 1
+
     def rotator(config, name, point: Point):
         try:
             # simple case: number gets added to point rotation
             angle = evaluate_expression(config, units)
-            return Point(p=point.p, r=point.r + angle)
+            return Point(p=point.p, r=point.r + flip * angle, meta=point.meta)
         except:
             target = parse_anchor(config, name, points, start, units)
-            return Point(p=point.p, r=target.p.get_angle(point.p))
+            return Point(p=point.p, r=target.p.get_angle(point.p), meta=point.meta)
 
     if orient := raw.get('orient'):
         point = rotator(orient, f"{name}.orient", point)
@@ -360,28 +699,101 @@ def parse_anchor(raw, name, points: Dict[str, Point] = {}, start: Point = Point(
         xyval = [shift, shift] if not isinstance(shift, list) else shift
             
         xyval = [evaluate_expression(v, units) for v in xyval]
-        point.p += Vector(xyval).rotate(Axis.Z, point.r)
+        point.p += Vector(flip * xyval[0], xyval[1]).rotate(Axis.Z, point.r)
 
     if rotate := raw.get('rotate'):
         point = rotator(rotate, f"{name}.rotate", point)
 
     if affect := raw.get('affect'):
-        candidate = copy(point)
-        point = copy(start)
-        point.meta = candidate.meta
+        candidate = point
+        point = Point(start.p, start.r, candidate.meta)
         affect = list(affect) if isinstance(affect, str) else affect
-        for aff in affect:
-            if aff == 'x':
-                point.p.X = candidate.p.X
-            elif aff == 'y':
-                point.p.Y = candidate.p.Y
-            elif aff == 'r':
-                point.r = candidate.r
+        # build a new vector, the start point's one may be shared with other points
+        point.p = Vector(candidate.p.X if 'x' in affect else point.p.X, candidate.p.Y if 'y' in affect else point.p.Y)
+        if 'r' in affect:
+            point.r = candidate.r
 
     return point
 
-def parse_points(config: Dict, units: Dict[str, float]) -> Dict[str, Point]:
-    """Parse the points section of the config."""
+def place_zone(zone_name: str, zone: Dict, points: Dict[str, Point], global_key: Dict, units: Dict[str, float], backend: str = 'build123d') -> Dict[str, Point]:
+    """Render a single zone at its anchor, resolved against the points of the zones before it.
+    Global rotation and skipping are left to the caller."""
+    anchor = parse_anchor(zone.get('anchor', {}), f'points.zones.{zone_name}.anchor', points, Point(), units)
+    rotate: float = evaluate_expression(zone.get('rotate', 0), units)
+
+    mirror = zone.get('mirror')
+
+    # anchor, rotate and mirror are handled here, not at the zone render level
+    zone = {k: v for k, v in zone.items() if k not in ('anchor', 'rotate', 'mirror')}
+    new_points = render_zone(zone_name, zone, anchor, global_key, units, backend)
+
+    # simplifying the names of single-key zones and columns, repeatedly: 'zone_default_default' becomes 'zone'
+    default_postfix = '_default'
+    while keys_with_default_postfix := [k for k in new_points.keys() if k.endswith(default_postfix)]:
+        for key in keys_with_default_postfix:
+            new_key = key[:-len(default_postfix)]
+            new_points[new_key] = new_points[key]
+            new_points[new_key].meta.name = sys.intern(new_key)
+            del new_points[key]
+
+    for new_point in new_points.values():
+        if rotate:
+            new_point.p = new_point.p.rotate(Axis.Z, rotate)
+            new_point.r += rotate
+
+    # the mirror axis may refer to the zone's own keys
+    axis = parse_axis(mirror, f'points.zones.{zone_name}.mirror', {**points, **new_points}, units)
+    if axis is not None:
+        new_points.update(mirror_points(new_points, axis))
+
+    return new_points
+
+def parse_axis(config: Any, name: str, points: Dict[str, Point], units: Dict[str, float]) -> float | None:
+    """X coordinate of a mirror axis. Either a number, or an anchor with an optional
+    'distance' between it and its mirror image."""
+    if config is None:
+        return None
+    if not isinstance(config, dict):
+        return evaluate_expression(config, units)
+    distance = evaluate_expression(config.get('distance', 0), units)
+    anchor = {k: v for k, v in config.items() if k != 'distance'}
+    return parse_anchor(anchor, name, points, Point(), units).p.X + distance / 2
+
+def mirror_name(name: str) -> str:
+    return name[len('mirror_'):] if name.startswith('mirror_') else f'mirror_{name}'
+
+def mirror_points(points: Dict[str, Point], axis: float) -> Dict[str, Point]:
+    """Reflect keys about the vertical line x = axis and return the mirrored copies.
+    Keys with asym 'source' aren't mirrored, keys with asym 'clone' only exist mirrored,
+    so their originals get marked as skipped. Also usable on finished points, e.g. to get
+    the right half about x = 0."""
+    mirrored: Dict[str, Point] = {}
+    for point in points.values():
+        meta = point.meta
+        meta.mirrored = False
+        if meta.asym == 'source':
+            continue
+        name = sys.intern(mirror_name(meta.name))
+        mirrored[name] = Point(Vector(2 * axis - point.p.X, point.p.Y), -point.r, replace(meta, name=name, mirrored=True))
+        if meta.asym == 'clone':
+            meta.skip = True
+    return mirrored
+
+def finish_points(points: Dict[str, Point], global_rotate: float, global_mirror: Any = None, units: Dict[str, float] = {}) -> Dict[str, Point]:
+    """Apply the global rotation, mirror the keys no zone has mirrored yet and drop skipped keys."""
+    for point in points.values():
+        point.p = point.p.rotate(Axis.Z, global_rotate)
+        point.r += global_rotate
+
+    axis = parse_axis(global_mirror, 'points.mirror', points, units)
+    if axis is not None:
+        points.update(mirror_points({k: p for k, p in points.items() if p.meta is not None and p.meta.mirrored is None}, axis))
+
+    return {k: p for k, p in points.items() if not (p.meta and p.meta.skip)}
+
+def parse_points(config: Dict, units: Dict[str, float], backend: str = 'build123d') -> Dict[str, Point]:
+    """Parse the points section of the config.
+    The backend ('build123d' or 'numpy') selects how zones are laid out, see render_zone."""
     zones = get_nested_value(config, 'zones')
     global_key = get_nested_value(config, 'key') or {}
     global_rotate = get_nested_value(config, 'rotate') or 0
@@ -390,60 +802,117 @@ def parse_points(config: Dict, units: Dict[str, float]) -> Dict[str, Point]:
 
     # rendering zones
     for zone_name, zone in zones.items():
-        # extracting keys that are handled here, not at the zone render level
-        anchor = parse_anchor(zone.get('anchor', {}), f'points.zones.{zone_name}.anchor', points, Point(), units)
-        if 'anchor' in zone:
-            del zone['anchor']
-
-        rotate: float = evaluate_expression(zone.get('rotate', 0), units)
-        if 'rotate' in zone:
-            del zone['rotate']
+        points.update(place_zone(zone_name, zone, points, global_key, units, backend))
 
-        # creating new points
-        new_points = render_zone(zone_name, zone, anchor, global_key, units)
+    return finish_points(points, global_rotate, config.get('mirror'), units)
 
-        default_postfix = '_default'
-        keys_with_default_postfix = [k for k in new_points.keys() if k.endswith(default_postfix)]
-        for key in keys_with_default_postfix:
-            new_key = key[:-len(default_postfix)]
-            new_points[new_key] = new_points[key]
-            new_points[new_key].meta['name'] = new_key
-            del new_points[key]
+NAME = re.compile(r'[A-Za-z_$][A-Za-z0-9_$]*')
 
-        for new_point in new_points.values():
-            if rotate:
-                new_point.p = new_point.p.rotate(Axis.Z, rotate)
-                new_point.r += rotate
+def anchor_refs(raw: Any) -> set[str]:
+    """Names of all points an anchor definition may refer to, including nested refs and aggregate parts.
+    Numeric expressions in orient/rotate are included as well - they simply never match a point."""
+    if isinstance(raw, str):
+        return {raw}
+    if isinstance(raw, list):
+        return set().union(*(anchor_refs(step) for step in raw))
+    if not isinstance(raw, dict):
+        return set()
+
+    refs = anchor_refs(raw.get('ref'))
+    for part in (raw.get('aggregate') or {}).get('parts', []):
+        refs |= anchor_refs(part)
+    for key in ('orient', 'rotate'):
+        refs |= anchor_refs(raw.get(key))
+    return refs
+
+def used_names(value: Any) -> set[str]:
+    """All identifiers appearing in the string leaves of a config value, i.e. every unit it might use."""
+    if isinstance(value, dict):
+        return set().union(*(used_names(v) for v in value.values()))
+    if isinstance(value, list):
+        return set().union(*(used_names(v) for v in value))
+    if isinstance(value, str):
+        return set(NAME.findall(value))
+    return set()
+
+def zones_by_point(points: Dict[str, Point]) -> Dict[str, Dict[str, Point]]:
+    """Group points by the zone that generated them."""
+    grouped: Dict[str, Dict[str, Point]] = {}
+    for name, point in points.items():
+        grouped.setdefault(point.meta.zone.name, {})[name] = point
+    return grouped
+
+def update_points(old_config: Dict, old_points: Dict[str, Point], new_config: Dict, backend: str = 'build123d') -> Dict[str, Point]:
+    """Incrementally re-parse the points of an edited config.
+
+    old_points must be the result of parsing old_config (both normalized, as in points_from_config).
+    Only zones whose definition, units or upstream anchors changed are rendered again, all other
+    zones reuse their old points. Falls back to a full parse whenever reuse can't be proven safe.
+    The old points are left untouched."""
+    old_units = parse_units(old_config)
+    units = parse_units(new_config)
+    old_section = old_config.get('points', {})
+    section = new_config.get('points', {})
+    old_zones = old_section.get('zones') or {}
+    zones = section.get('zones') or {}
+    global_key = section.get('key') or {}
+    global_rotate = section.get('rotate') or 0
+
+    changed_units = {k for k in old_units.keys() | units.keys() if old_units.get(k) != units.get(k)}
+    kept_order = [z for z in old_zones if z in zones]
+    if (global_key != (old_section.get('key') or {})
+            or global_rotate != (old_section.get('rotate') or 0)
+            # globally mirrored keys and skipped clones can't be told apart from the zones' own keys
+            or section.get('mirror') is not None
+            or old_section.get('mirror') is not None
+            or kept_order != [z for z in zones if z in old_zones]
+            or any(k.startswith('$default_') for k in changed_units)
+            or changed_units & used_names(global_key)):
+        return parse_points(section, units, backend)
+
+    # old points without the global rotation, as the zones were originally placed
+    old_rotate = old_section.get('rotate') or 0
+    reusable = {
+        zone_name: {name: Point(p=p.p.rotate(Axis.Z, -old_rotate), r=p.r - old_rotate, meta=p.meta) for name, p in zone_points.items()}
+        for zone_name, zone_points in zones_by_point(old_points).items()}
+
+    # names that were or are produced by re-rendered or removed zones
+    dirty_names = {name for zone_name in old_zones if zone_name not in zones for name in reusable.get(zone_name, {})}
 
+    points: Dict[str, Point] = {}
+    for zone_name, zone in zones.items():
+        dirty = (zone != old_zones.get(zone_name)
+                 or changed_units & used_names(zone)
+                 or (anchor_refs(zone.get('anchor', {})) | anchor_refs(zone.get('mirror'))) & dirty_names)
+        if dirty:
+            try:
+                new_points = place_zone(zone_name, zone, points, global_key, units, backend)
+            except KeyError:
+                # the anchor refers to a point that isn't available, e.g. a skipped key of a reused zone
+                return parse_points(section, units, backend)
+            dirty_names |= reusable.get(zone_name, {}).keys() | new_points.keys()
+        else:
+            new_points = reusable.get(zone_name, {})
         points.update(new_points)
 
-    # applying global rotation
-    for point in points.values():
-        point.p = point.p.rotate(Axis.Z, global_rotate)
-        point.r += global_rotate
+    return finish_points(points, global_rotate)
 
-    filtered = {k: p for k, p in points.items() if not p.meta.get('skip', False)}
-
-    return filtered
+def points_from_config(config: Dict, backend: str = 'build123d') -> Dict[str, Point]:
+    """Parse the points of an already normalized config."""
+    units = parse_units(config)
+    return parse_points(config.get('points', {}), units, backend)
 
-def get_points(file_path: str = None) -> Dict[str, Point]:
+def get_points(file_path: str = None, backend: str = 'build123d') -> Dict[str, Point]:
     config_path = file_path
     config = load_config(config_path)
-    config = unflatten_dot_notation(config)
-    config = handle_inheritance(config)
-    config = parameterize(config)
-
-    units = parse_units(config)
-    points = parse_points(config.get('points', {}), units)
+    config = normalize_config(config)
 
-    return points
+    return points_from_config(config, backend)
 
 def main(config_path: str):
     global config
     config = load_config(config_path)
-    config = unflatten_dot_notation(config)
-    config = handle_inheritance(config)
-    config = parameterize(config)
+    config = normalize_config(config)
 
     units = parse_units(config)
     points = parse_points(config.get('points', {}), units)
@@ -451,7 +920,7 @@ def main(config_path: str):
     with BuildSketch() as sketch:
         for point in points.values():
             with Locations(point.p):
-                Rectangle(point.meta.get('width', 18), point.meta.get('height', 18), rotation=point.r)
+                Rectangle(point.meta.width, point.meta.height, rotation=point.r)
 
     push_object(sketch.sketch, name="Points")
 
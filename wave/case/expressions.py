@@ -0,0 +1,174 @@
+"""Small arithmetic evaluator for ergogen expressions.
+
+Supports what ergogen configs actually use: numbers, unit names (including
+`$default_*`), `+ - * / ^ **`, parentheses, implicit multiplication such as
+`1.2py` or `2(kx + 1)`, and a handful of math functions and constants.
+Anything else raises an ExpressionError so callers can fall back to sympy.
+"""
+import math
+import re
+from typing import Callable, Dict
+
+class ExpressionError(ValueError):
+    pass
+
+Compiled = Callable[[Dict[str, float]], float]
+
+FUNCTIONS: Dict[str, Callable[..., float]] = {
+    'sqrt': math.sqrt,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'atan2': math.atan2,
+    'floor': math.floor,
+    'ceiling': math.ceil,
+}
+
+CONSTANTS: Dict[str, float] = {
+    'pi': math.pi,
+    'E': math.e,
+}
+
+TOKEN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_$][A-Za-z0-9_$]*)|(\*\*|[-+*/^(),]))')
+
+# binding powers of the infix operators
+INFIX = {'+': 10, '-': 10, '*': 20, '/': 20, '^': 30, '**': 30}
+IMPLICIT = 20
+PREFIX = 25
+
+def tokenize(expr: str) -> list[tuple[str, str]]:
+    """Split an expression into (kind, text) tokens, kind being 'num', 'name' or 'op'."""
+    tokens = []
+    pos = 0
+    end = len(expr.rstrip())
+    while pos < end:
+        match = TOKEN.match(expr, pos)
+        if not match or match.end() == pos:
+            raise ExpressionError(f"Unexpected character in '{expr}' at position {pos}")
+        number, name, op = match.groups()
+        if number is not None:
+            tokens.append(('num', number))
+        elif name is not None:
+            tokens.append(('name', name))
+        else:
+            tokens.append(('op', op))
+        pos = match.end()
+    return tokens
+
+def lookup(name: str) -> Compiled:
+    def value(context: Dict[str, float]) -> float:
+        if name in context:
+            return context[name]
+        return CONSTANTS[name]
+    return value
+
+def binary(op: str, left: Compiled, right: Compiled) -> Compiled:
+    if op == '+':
+        return lambda c: left(c) + right(c)
+    if op == '-':
+        return lambda c: left(c) - right(c)
+    if op == '*':
+        return lambda c: left(c) * right(c)
+    if op == '/':
+        return lambda c: left(c) / right(c)
+    return lambda c: left(c) ** right(c)
+
+class Parser:
+    """Pratt parser that turns the token stream into nested closures over a unit context."""
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self.tokens = tokenize(expr)
+        self.pos = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise ExpressionError(f"Unexpected end of expression '{self.expr}'")
+        self.pos += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        kind, value = self.next()
+        if kind != 'op' or value != text:
+            raise ExpressionError(f"Expected '{text}' in '{self.expr}', got '{value}'")
+
+    def left_binding_power(self, token: tuple[str, str] | None) -> int:
+        if token is None:
+            return 0
+        kind, value = token
+        if kind == 'op':
+            if value == '(':
+                return IMPLICIT
+            return INFIX.get(value, 0)
+        # a number or name directly following an operand is an implicit multiplication
+        return IMPLICIT
+
+    def parse(self) -> Compiled:
+        result = self.expression(0)
+        if self.peek() is not None:
+            raise ExpressionError(f"Unexpected '{self.peek()[1]}' in '{self.expr}'")
+        return result
+
+    def expression(self, right_binding_power: int) -> Compiled:
+        left = self.prefix(self.next())
+        while right_binding_power < self.left_binding_power(self.peek()):
+            kind, value = self.peek()
+            if kind == 'op' and value in INFIX:
+                self.next()
+                if value in ('^', '**'):
+                    # right associative
+                    right = self.expression(INFIX[value] - 1)
+                else:
+                    right = self.expression(INFIX[value])
+                left = binary(value, left, right)
+            else:
+                left = binary('*', left, self.expression(IMPLICIT))
+        return left
+
+    def prefix(self, token: tuple[str, str]) -> Compiled:
+        kind, value = token
+        if kind == 'num':
+            number = float(value)
+            return lambda c: number
+        if kind == 'name':
+            if value in FUNCTIONS and self.peek() == ('op', '('):
+                return self.call(FUNCTIONS[value])
+            return lookup(value)
+        if value == '(':
+            inner = self.expression(0)
+            self.expect(')')
+            return inner
+        if value == '-':
+            operand = self.expression(PREFIX)
+            return lambda c: -operand(c)
+        if value == '+':
+            return self.expression(PREFIX)
+        raise ExpressionError(f"Unexpected '{value}' in '{self.expr}'")
+
+    def call(self, fn: Callable[..., float]) -> Compiled:
+        self.expect('(')
+        args = [self.expression(0)]
+        while self.peek() == ('op', ','):
+            self.next()
+            args.append(self.expression(0))
+        self.expect(')')
+        return lambda c: fn(*[arg(c) for arg in args])
+
+def compile_expression(expr: str) -> Compiled:
+    """Compile an expression into a callable that evaluates it against a dict of units.
+    Unknown names raise a KeyError only when the callable is evaluated.
+    """
+    return Parser(expr).parse()
+
+def evaluate(expr: str, context: Dict[str, float]) -> float:
+    return float(compile_expression(expr)(context))
@@ -8,7 +8,8 @@ from functools import reduce
 import math
 from build123d import *
 from models.switch import Switch
-from ergogen import Point, get_points
+from ergogen import Point
+from points_cache import get_points
 from itertools import groupby
 from collections import OrderedDict, defaultdict
 
@@ -3,26 +3,138 @@ if __name__ == "__main__":
     # add parent directory to path
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import copy
+import functools
+from dataclasses import dataclass, field
+import inspect
 import math
+from typing import Callable
+import numpy as np
 from build123d import *
+from OCP.BRep import BRep_Tool
+from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeEdge
 from models.switch import Switch
 from models.keys import ErgoKeys
-from ergogen import Point, get_points
+from ergogen import Point
+from points_cache import get_points
+import polygons
+
+def memoized(method):
+    """Cache what a sketch-creating method returns per instance and argument values.
+    Every call hands out shallow copies, so callers can move or locate them freely."""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(v for k, v in bound.arguments.items() if k != 'self')
+        if key not in self.sketch_cache:
+            self.sketch_cache[key] = method(self, *args, **kwargs)
+        cached = self.sketch_cache[key]
+        return tuple(copy.copy(c) for c in cached) if isinstance(cached, tuple) else copy.copy(cached)
+    return wrapper
+
+def reversed_edge(edge: Edge) -> Edge:
+    """Same as Edge.reversed, minus the deep copy of the edge it starts with, which is slow."""
+    curve = BRep_Tool.Curve_s(edge.wrapped, edge.param_at(0), edge.param_at(1))
+    first, last = curve.ReversedParameter(edge.param_at(0)), curve.ReversedParameter(edge.param_at(1))
+    return Edge(BRepBuilderAPI_MakeEdge(curve.Reversed(), last, first).Edge())
+
+class EdgeIndex:
+    """Uniform grid over the bounding boxes of a set of edges, so that only edges
+    whose boxes overlap a query box need an exact intersection test."""
+    def __init__(self, edges: list[Edge], tolerance: float = 1e-6):
+        self.edges = list(edges)
+        self.tolerance = tolerance
+        self.boxes = [self.box(edge) for edge in self.edges]
+        sizes = sorted(max(x1 - x0, y1 - y0) for x0, y0, x1, y1 in self.boxes)
+        # typical edge size, so most edges span only a few cells
+        self.cell_size = max(sizes[len(sizes) // 2], 1.0) if sizes else 1.0
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        for i, box in enumerate(self.boxes):
+            for cell in self.cells_of(box):
+                self.cells.setdefault(cell, []).append(i)
+
+    def box(self, edge: Edge) -> tuple[float, float, float, float]:
+        bb = edge.bounding_box()
+        return (bb.min.X - self.tolerance, bb.min.Y - self.tolerance, bb.max.X + self.tolerance, bb.max.Y + self.tolerance)
+
+    def cells_of(self, box: tuple[float, float, float, float]):
+        x0, y0, x1, y1 = box
+        for i in range(math.floor(x0 / self.cell_size), math.floor(x1 / self.cell_size) + 1):
+            for j in range(math.floor(y0 / self.cell_size), math.floor(y1 / self.cell_size) + 1):
+                yield (i, j)
+
+    def candidates(self, edge: Edge) -> list[Edge]:
+        """Indexed edges whose bounding box overlaps the one of the given edge, in their original order."""
+        box = self.box(edge)
+        x0, y0, x1, y1 = box
+        found = set()
+        for cell in self.cells_of(box):
+            for i in self.cells.get(cell, ()):
+                bx0, by0, bx1, by1 = self.boxes[i]
+                if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1:
+                    found.add(i)
+        return [self.edges[i] for i in sorted(found)]
+
+class EndPointIndex:
+    """Edges by their quantized end points, to find the edges that meet at a point without comparing all of them."""
+    def __init__(self, edges: list[Edge], tolerance: float = 1e-4):
+        self.edges = list(edges)
+        self.tolerance = tolerance
+        self.ends = [(e.start_point(), e.end_point()) for e in self.edges]
+        self.cells: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        for i, points in enumerate(self.ends):
+            for end, point in enumerate(points):
+                self.cells.setdefault(self.cell(point), []).append((i, end))
+
+    def cell(self, point: Vector) -> tuple[int, int]:
+        return (round(point.X / self.tolerance), round(point.Y / self.tolerance))
+
+    def at(self, point: Vector) -> list[tuple[int, int]]:
+        """(edge index, 0 for its start or 1 for its end) of every end point at the given point."""
+        x, y = self.cell(point)
+        # neighbouring cells too, for end points that round to different cells
+        return [(i, end) for dx in (0, -1, 1) for dy in (0, -1, 1) for i, end in self.cells.get((x + dx, y + dy), ())
+                if (self.ends[i][end] - point).length <= self.tolerance]
+
+@dataclass
+class Corner:
+    position: Vector
+    # between the two edges leaving the corner, 180 where they continue straight on
+    angle: float
+    # largest fillet that fits between the corner and its neighbours
+    max_radius: float
+    vertex: Vertex = field(repr=False)
 
 class Outline:
-    def __init__(self, switch: Switch, keys: ErgoKeys, wall_thickness=1.8, additional_top_space=10):
+    def __init__(self, switch: Switch, keys: ErgoKeys, wall_thickness=1.8, additional_top_space=10, polygon_backend='build123d'):
+        """polygon_backend selects how key footprints get merged into the keywell outline:
+        'build123d' fuses OCCT faces, 'numpy' uses the much faster 2D kernel in polygons.py."""
+        if polygon_backend not in ('build123d', 'numpy'):
+            raise ValueError(f"Unknown polygon backend '{polygon_backend}'")
         self.switch = switch
         self.keys = keys
+        self.polygon_backend = polygon_backend
+        # derived sketches by method and arguments, see memoized
+        self.sketch_cache = {}
+        # corners that didn't get their fillet, by the outline they belong to, e.g. 'inner_outline(-1.8)'
+        self.skipped_corners: dict[str, list[Corner]] = {}
         
         self.wall_thickness = wall_thickness
 
         self.cirque_recess_radius = 22
         self.cirque_recess_position = Vector(30, -24)
+        # distance between the recess and the keywell, None if the recess didn't fit anywhere
+        self.cirque_recess_clearance = None
         
         self.d_x = switch.cap.d.X / 2 + 2*wall_thickness
         self.d_y = switch.cap.d.Y / 2 + 2*wall_thickness
 
         self.keywell_sketch, fingers_sketch = self.create_keywell_outline()
+        self.keywell_index = EdgeIndex(self.keywell_sketch.edges())
+        self.keywell_segments = polygons.edge_segments(self.keywell_sketch.edges())
         # find left, right, top, bottom points
         finger_outer_points = ShapeList({e.start_point() for e in fingers_sketch.edges()} | {e.end_point() for e in fingers_sketch.edges()})
         self.left = finger_outer_points.sort_by(Axis.X)[0].X - self.wall_thickness
@@ -48,46 +160,37 @@ class Outline:
         count = len(vertices)
         return Vector(x_sum / count, y_sum / count, z_sum / count)
 
-    def orient_wire_ccw(self, wire: Wire) -> Wire:
+    def orient_wire_ccw(self, wire: Wire, tolerance: float = 1e-4) -> Wire:
         """
-        Given a wire and a center point, reorient and sort the edges
-        so they form a counter-clockwise loop around the center.
-        Returns a new Wire with edges ordered CCW and oriented consistently.
+        Chain the edges of a closed wire through their shared end points and orient
+        the loop counter-clockwise by its signed area.
+        End points are looked up in an EndPointIndex, so this is linear in the
+        number of edges and doesn't care whether the outline is concave.
         """
-        center: Vector = self.centroid(wire)
+        index = EndPointIndex(wire.edges(), tolerance)
+        edges, ends = index.edges, index.ends
+
+        # chain (edge index, flipped) pairs first, so that every edge gets reversed at most once
+        chain = [(0, False)]
+        used = {0}
+        while len(chain) < len(edges):
+            i, flipped = chain[-1]
+            end = ends[i][0 if flipped else 1]
+            touching = next(((j, j_end) for j, j_end in index.at(end) if j not in used), None)
+            if touching is None:
+                raise ValueError(f"Wire is not closed, no edge continues at {end}")
+            j, j_end = touching
+            used.add(j)
+            # the edge may point either way, it's flipped if its end touches the chain
+            chain.append((j, j_end == 1))
+
+        # shoelace over start and mid points, so that arcs count with their bulge
+        points = [p for i, flipped in chain for p in (ends[i][1 if flipped else 0], edges[i].position_at(0.5))]
+        area = sum(a.X * b.Y - b.X * a.Y for a, b in zip(points, points[1:] + points[:1]))
+        if area < 0:
+            chain = [(i, not flipped) for i, flipped in reversed(chain)]
+        return Wire([reversed_edge(edges[i]) if flipped else edges[i] for i, flipped in chain])
 
-        # Function to compute angle from center to edge start point
-        def angle_of_edge(edge: Edge) -> float:
-            start = edge.start_point()
-            vec = start - center
-            return math.atan2(vec.Y, vec.X)
-        
-        # Reorient edges to have direction going counter-clockwise:
-        # We'll check orientation against center + perpendicular vector
-        def reorient_edge(edge: Edge) -> Edge:
-            # Vector from center to start and end points
-            start_vec = edge.start_point() - center
-            end_vec = edge.end_point() - center
-            
-            # Determine current edge direction relative to center
-            # Calculate cross product to see if edge goes CW or CCW relative to center
-            cross = start_vec.cross(end_vec).Z
-
-            # If cross is negative, edge is clockwise w.r.t. center, reverse it
-            if cross < 0:
-                return edge.reversed()
-            else:
-                return edge
-        
-        # Reorient all edges first
-        reoriented = [reorient_edge(edge) for edge in wire.edges()]
-        
-        # Sort edges by angle of their start point (CCW order)
-        sorted_edges = sorted(reoriented, key=angle_of_edge)
-        
-        # Create new wire from sorted edges
-        return Wire(sorted_edges)
-    
     def reorient_edges(self, sketch: Sketch) -> Sketch:
         """reorient edges in the sketch to be consistently CCW."""
         with BuildSketch() as sk:
@@ -96,14 +199,63 @@ class Outline:
                 make_face(self.orient_wire_ccw(wire))
         return sk.sketch
 
+    def find_corners(self, sketch: Sketch, radius: float, select: Callable[[float], bool]) -> tuple[list[Corner], list[Corner]]:
+        """Corners of the sketch whose angle is selected, split into those a fillet of the radius fits at
+        and those it doesn't. A fillet needs radius / tan(angle / 2) of both edges, and an edge is shared
+        with the fillet at its other end. Curved edges count with their length, and where edges continue
+        tangentially there's no corner at all."""
+        corners = []
+        edge_ends = {}
+        for wire in sketch.wires():
+            index = EndPointIndex(wire.edges())
+            for vertex in wire.vertices():
+                position = Vector(vertex)
+                meeting = index.at(position)
+                if len(meeting) != 2:
+                    continue
+                # directions leaving the corner along both edges
+                (i, i_end), (j, j_end) = meeting
+                d1 = index.edges[i].tangent_at(i_end) * (-1 if i_end else 1)
+                d2 = index.edges[j].tangent_at(j_end) * (-1 if j_end else 1)
+                angle = math.degrees(math.acos(max(-1.0, min(1.0, d1.dot(d2)))))
+                if angle < 179.9 and select(angle):
+                    corners.append((Corner(position, angle, 0, vertex), [index.edges[i], index.edges[j]]))
+                    for edge in (index.edges[i], index.edges[j]):
+                        edge_ends[edge] = edge_ends.get(edge, 0) + 1
+
+        feasible, skipped = [], []
+        for corner, edges in corners:
+            available = min(edge.length / edge_ends[edge] for edge in edges)
+            corner.max_radius = available * math.tan(math.radians(corner.angle) / 2)
+            (feasible if radius <= corner.max_radius else skipped).append(corner)
+        return feasible, skipped
+
+    def fillet_corners(self, name: str, builder: BuildSketch, radius: float, select: Callable[[float], bool]) -> None:
+        """Fillet the selected corners of the builder's sketch in one go, see find_corners.
+        Corners that can't take the radius end up in self.skipped_corners[name]."""
+        feasible, skipped = self.find_corners(builder.sketch_local, radius, select)
+        if feasible:
+            try:
+                fillet([c.vertex for c in feasible], radius=radius)
+            except Exception:
+                # the estimate was off somewhere, find out where one corner at a time
+                for corner in feasible:
+                    v = vertices().filter_by(lambda v: (Vector(v) - corner.position).length < 1e-4)
+                    try:
+                        fillet(v, radius=radius)
+                    except Exception:
+                        skipped.append(corner)
+        self.skipped_corners[name] = skipped
+
     def is_crossing_keywell(self, edges: list[Edge]) -> bool:
         for e in edges: 
-            for edge in self.keywell_sketch.edges():
+            for edge in self.keywell_index.candidates(e):
                 inter = e.intersect(edge)
                 if inter:
                     return True
         return False
 
+    @memoized
     def create_outline(self):
         bottom_left_thumb_key = self.keys.thumb_clusters[0][0][0]
         bottom_right_thumb_key = self.keys.thumb_clusters[0][len(self.keys.thumb_clusters[0])-1][0]
@@ -136,45 +288,55 @@ class Outline:
                 with Locations(thumb_key.p):
                     Rectangle(2*self.d_x, 2*self.d_y, rotation=thumb_key.r)
 
-            # position the circle in a way that it touches self.thumb_bottom_left
-            # iterate over lowest keys to find a good place
-            found_position = False
-            for cluster in self.keys.clusters:
-                if found_position:
-                    break
-                for col in cluster:
-                    if found_position:
-                        break
-                    for key in col:
-                        if found_position:
-                            break
-
-                        key_bottom_right = key.p + Vector(self.d_x, -self.d_y).rotate(Axis.Z, key.r)
-                        midpoint = (key_bottom_right + self.thumb_bottom_left) / 2
-                        chord_vec = self.thumb_bottom_left - key_bottom_right
-
-                        loc = Vector(midpoint.X, self.cirque_recess_position.Y)
-                        with Locations(loc):
-                            c = Circle(self.cirque_recess_radius, mode=Mode.PRIVATE)
-                        if self.cirque_recess_radius < chord_vec.length / 2 and not self.is_crossing_keywell(c.edges()):
-                            # there's definitelly enough space for the circle here - just position it next to the thumb cluster
-                            add(c, mode=Mode.SUBTRACT)
-                            self.cirque_recess_position = loc
-                            found_position = True
+            # position the circle next to self.thumb_bottom_left, see place_cirque_recess
+            placement = self.place_cirque_recess()
+            if placement is not None:
+                self.cirque_recess_position, self.cirque_recess_clearance = placement
+                with Locations(self.cirque_recess_position):
+                    Circle(self.cirque_recess_radius, mode=Mode.SUBTRACT)
             fillet(vertices(), radius=1)
         return self.reorient_edges(outline.sketch)
     
+    def cirque_recess_candidates(self) -> list[Vector]:
+        """Centers at the recess' height, halfway between the bottom right corner of a key and
+        self.thumb_bottom_left, for every key where that gap is wider than the recess."""
+        candidates = []
+        for cluster in self.keys.clusters:
+            for col in cluster:
+                for key in col:
+                    key_bottom_right = key.p + Vector(self.d_x, -self.d_y).rotate(Axis.Z, key.r)
+                    if self.cirque_recess_radius < (self.thumb_bottom_left - key_bottom_right).length / 2:
+                        midpoint = (key_bottom_right + self.thumb_bottom_left) / 2
+                        candidates.append(Vector(midpoint.X, self.cirque_recess_position.Y))
+        return candidates
+
+    def place_cirque_recess(self, min_clearance: float = 0) -> tuple[Vector, float] | None:
+        """Center of the cirque recess and its clearance to the keywell, or None if it doesn't fit.
+        Clearances are circle-to-polygon distances in 2D; of the candidates outside the keywell with
+        enough clearance, the one closest to the thumb cluster wins. Only that one is checked with OCCT."""
+        candidates = self.cirque_recess_candidates()
+        if not candidates:
+            return None
+        centers = np.array([(c.X, c.Y) for c in candidates])
+        starts, ends = self.keywell_segments
+        clearances = polygons.distance_to_segments(centers, starts, ends) - self.cirque_recess_radius
+        to_thumbs = np.linalg.norm(centers - (self.thumb_bottom_left.X, self.thumb_bottom_left.Y), axis=1)
+        feasible = [i for i, center in enumerate(centers)
+                    if clearances[i] >= min_clearance and not polygons.segments_contain(starts, ends, center)]
+
+        for i in sorted(feasible, key=lambda i: (to_thumbs[i], -clearances[i])):
+            circle = Circle(self.cirque_recess_radius, mode=Mode.PRIVATE).moved(Location(candidates[i]))
+            if not self.is_crossing_keywell(circle.edges()):
+                return candidates[i], float(clearances[i])
+        return None
+
+    @memoized
     def create_inner_outline(self, offset_by=-1.8):
         with BuildSketch() as inner_outline:
             add(self.sketch)
             if offset_by != 0:
                 offset(amount=offset_by)
-                for vertex in vertices():
-                    try:
-                        fillet(vertex, radius=1)
-                    except Exception as e:
-                        #ignore fillet errors
-                        pass
+                self.fillet_corners(f'inner_outline({offset_by})', inner_outline, radius=1, select=lambda angle: True)
 
             rect_y = 15
             with Locations(self.cirque_recess_position + (0, self.cirque_recess_radius - rect_y/3)):
@@ -184,42 +346,47 @@ class Outline:
 
         return self.reorient_edges(inner_outline.sketch)
 
+    def key_footprints(self, keys) -> list:
+        return [polygons.rectangle(key.p, self.d_x*1.6, self.d_y*1.6, key.r) for key in keys]
+
+    @memoized
     def create_keywell_outline(self):
-        with BuildSketch() as fingers_outline:
-            for key in self.keys.finger_keys:
-                with BuildSketch():
-                    with Locations(key.p):
-                        Rectangle(self.d_x*1.6, self.d_y*1.6, rotation=key.r)
-        with BuildSketch() as thumbs_outline:
-            for key in self.keys.thumb_keys:
-                with BuildSketch():
-                    with Locations(key.p):
-                        Rectangle(self.d_x*1.6, self.d_y*1.6, rotation=key.r)
+        if self.polygon_backend == 'numpy':
+            # union and small hole removal in 2D, only the result becomes a sketch
+            fingers = polygons.union(self.key_footprints(self.keys.finger_keys))
+            keywell = polygons.union(self.key_footprints(self.keys.finger_keys) + self.key_footprints(self.keys.thumb_keys))
+            fingers_sketch = polygons.to_sketch(fingers)
+            keywell_footprints = polygons.to_sketch(polygons.fill_holes(keywell, 20))
+        else:
+            with BuildSketch() as fingers_outline:
+                for key in self.keys.finger_keys:
+                    with BuildSketch():
+                        with Locations(key.p):
+                            Rectangle(self.d_x*1.6, self.d_y*1.6, rotation=key.r)
+            with BuildSketch() as thumbs_outline:
+                for key in self.keys.thumb_keys:
+                    with BuildSketch():
+                        with Locations(key.p):
+                            Rectangle(self.d_x*1.6, self.d_y*1.6, rotation=key.r)
+            fingers_sketch = fingers_outline.sketch
 
         with BuildSketch() as keywell_outline:
-            add(fingers_outline)
-            add(thumbs_outline)
-
-            # remove small areas
-            for wire in wires().filter_by(lambda w: w.area < 20):
-                with BuildLine() as line:
-                    add(wire)
-                make_face()
-
-            # iterate over pairs of edges and fillet acute angles
-            t = edges()
-            pairs = zip(t, t[1:] + t[:1])
-            for e1, e2 in pairs:
-                angle = e1.tangent_at(0).get_angle(e2.tangent_at(0))
-                if angle < 30 or angle > 150:
-                    v = vertices().filter_by(lambda v: v in e1.vertices() and v in e2.vertices())
-                    if v:
-                        try:
-                            fillet(v, radius=0.7)
-                        except Exception as e:
-                            pass
-
-        return self.reorient_edges(keywell_outline.sketch), self.reorient_edges(fingers_outline.sketch)
+            if self.polygon_backend == 'numpy':
+                add(keywell_footprints)
+            else:
+                add(fingers_sketch)
+                add(thumbs_outline)
+
+                # remove small areas
+                for wire in wires().filter_by(lambda w: w.area < 20):
+                    with BuildLine() as line:
+                        add(wire)
+                    make_face()
+
+            # round spikes and nearly straight kinks, where the edges are close to parallel
+            self.fillet_corners('keywell', keywell_outline, radius=0.7, select=lambda angle: angle < 30 or angle > 150)
+
+        return self.reorient_edges(keywell_outline.sketch), self.reorient_edges(fingers_sketch)
 
 def add_arrows(edges):
     with BuildSketch() as arrows:
@@ -247,6 +414,9 @@ if __name__ == "__main__":
     keys = ErgoKeys(points=points)
     
     outline = Outline(switch=switch, keys=keys, wall_thickness=1.8)
+    print(f"cirque recess at {outline.cirque_recess_position}, clearance {outline.cirque_recess_clearance}")
+    for name, corners in outline.skipped_corners.items():
+        print(f"{name}: {len(corners)} corners left sharp {corners}")
     with BuildSketch() as choc_key_holes:
         for key in keys.keys:
             with BuildSketch():
@@ -6,6 +6,8 @@ if __name__ == "__main__":
 from dataclasses import dataclass
 from build123d import *
 from models.model_types import RectDimensions, RoundDimensions, PosAndDims
+from part_cache import cached_part
+from part_tools import ToolRegistry
 
 @dataclass
 class BoardDimensions:
@@ -53,6 +55,8 @@ class Xiao:
     def __init__(self, plane=Plane.XY, clearance=0.01):
         self.plane = plane
         self.clearance = clearance
+        self.part_cache = None
+        self.tools = ToolRegistry()
 
         self.model = self._create_model()
         self.reset_button_bump = self._create_reset_button_bump()
@@ -145,31 +149,42 @@ class Xiao:
                     Rectangle(4, 1)
         return usb_sketch.sketch
     
+    def _create_usb_cutout(self, sketch: Sketch) -> Part:
+        with BuildPart(mode=Mode.PRIVATE) as cutout:
+            with BuildSketch(self.usb_cut_sketch_plane) as cut_sketch:
+                add(sketch)
+            extrude(to_extrude=cut_sketch.sketch, amount=7)
+            extrude(to_extrude=cut_sketch.sketch, amount=-(self.usb.d.Y - self.usb.forward_y + self.clearance))
+        return cutout.part
+
     def _create_usb_cut_sketch_plane(self, model):
         front_dir_axis = Axis(origin=self.plane.origin, direction=self.plane.y_dir)
         boardfront:Face = model.faces().sort_by(front_dir_axis).filter_by(Axis.Y)[1]
         return boardfront
     
+    def cache_inputs(self):
+        """What the cutouts depend on besides the part, see part_cache.cached_part."""
+        return {'plane': self.plane, 'clearance': self.clearance}
+
+    @cached_part
     def add_large_usb_cutouts(self, part: Part):
+        cutout = self.tools.get('xiao_large_usb_cutout', lambda: self._create_usb_cutout(self._create_free_usb_space_sketch()), (self.plane, self.clearance))
         with BuildPart() as p:
             add(part)
-            with BuildSketch(self.usb_cut_sketch_plane) as cut_sketch:
-                add(self._create_free_usb_space_sketch())
-            extrude(to_extrude=cut_sketch.sketch, amount=7, mode=Mode.SUBTRACT)
-            extrude(to_extrude=cut_sketch.sketch, amount=-(self.usb.d.Y - self.usb.forward_y + self.clearance), mode=Mode.SUBTRACT)
+            add(cutout, mode=Mode.SUBTRACT)
 
         return p.part
 
+    @cached_part
     def add_usb_cutouts(self, part: Part):
+        cutout = self.tools.get('xiao_usb_cutout', lambda: self._create_usb_cutout(self._create_usb_cut_sketch()), (self.plane, self.clearance))
         with BuildPart() as p:
             add(part)
-            with BuildSketch(self.usb_cut_sketch_plane) as cut_sketch:
-                add(self._create_usb_cut_sketch())
-            extrude(to_extrude=cut_sketch.sketch, amount=7, mode=Mode.SUBTRACT)
-            extrude(to_extrude=cut_sketch.sketch, amount=-(self.usb.d.Y - self.usb.forward_y + self.clearance), mode=Mode.SUBTRACT)
+            add(cutout, mode=Mode.SUBTRACT)
 
         return p.part
     
+    @cached_part
     def add_reset_lever(self, part: Part, plane: Plane):
         with BuildPart() as p:
             add(part)
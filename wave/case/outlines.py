@@ -0,0 +1,214 @@
+"""Python port of ergogen's outlines stage, used for the laser cut layers in particle/case.
+
+Covers what duality_keyboard.yaml uses: rectangles (with rounded corners), circles,
+polygons and references to other outlines, placed at 'where' anchors or at every key
+matching a name filter, moved by 'adjust' and combined with add/subtract/intersect/stack
+(or the '+', '-', '~', '^' shorthands), plus 'fillet'. Outlines whose names start with
+'_' are helpers and aren't exported.
+"""
+if __name__ == "__main__":
+    import sys, os
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import os
+import re
+from typing import Any, Callable, Dict
+
+from build123d import Circle, Compound, ExportDXF, ExportSVG, Kind, Polygon, Pos, Rectangle, RectangleRounded, Rot, Shape, offset
+
+import ergogen
+from ergogen import Point, evaluate_expression, mirror_name, parse_anchor
+
+OPERATIONS = {'+': 'add', '-': 'subtract', '~': 'intersect', '^': 'stack'}
+
+def contains_object(value: Any) -> bool:
+    if isinstance(value, dict):
+        return True
+    if isinstance(value, list):
+        return any(contains_object(v) for v in value)
+    return False
+
+def name_test(value: str) -> Callable[[str], bool]:
+    """A single ergogen keyword filter: an exact name, or a '/regex/flags', optionally negated with '-'."""
+    negate = value.startswith('-')
+    value = value[1:] if negate else value
+    if value.startswith('/'):
+        pattern, _, flags = value[1:].rpartition('/')
+        regex = re.compile(pattern, re.IGNORECASE if 'i' in flags else 0)
+        test = lambda name: regex.search(name) is not None
+    else:
+        test = lambda name: name == value
+    return (lambda name: not test(name)) if negate else test
+
+def name_filter(config: Any, any_of: bool = True) -> Callable[[str], bool]:
+    """Keyword filters; lists alternate between 'any of' and 'all of' with every level of nesting."""
+    if isinstance(config, bool):
+        return lambda name: config
+    if isinstance(config, str):
+        return name_test(config)
+    tests = [name_filter(c, not any_of) for c in config]
+    if any_of:
+        return lambda name: any(test(name) for test in tests)
+    return lambda name: all(test(name) for test in tests)
+
+def parse_where(config: Any, name: str, points: Dict[str, Point], units: Dict[str, float], asym: str = 'source') -> list[Point]:
+    """The points a part gets placed at: the origin, an anchor, or all keys matching a filter."""
+    if config is None:
+        return [Point()]
+    if contains_object(config):
+        return [parse_anchor(config, name, points, Point(), units)]
+
+    test = name_filter(config)
+    matching = [p for p in points.values() if p.meta is not None and not p.meta.mirrored and test(p.meta.name)]
+    asym = ergogen.ASYM[asym]
+    result = matching if asym in ('source', 'both') else []
+    if asym in ('clone', 'both'):
+        result += [points[mirror_name(p.meta.name)] for p in matching if mirror_name(p.meta.name) in points]
+    return result
+
+def size(value: Any, units: Dict[str, float]) -> tuple[float, float]:
+    if isinstance(value, list):
+        return evaluate_expression(value[0], units), evaluate_expression(value[1], units)
+    side = evaluate_expression(value, units)
+    return side, side
+
+def position(shape: Shape, point: Point) -> Shape:
+    return shape.moved(Pos(point.p.X, point.p.Y) * Rot(0, 0, point.r))
+
+def unposition(shape: Shape, point: Point) -> Shape:
+    return shape.moved(Rot(0, 0, -point.r) * Pos(-point.p.X, -point.p.Y))
+
+def is_empty(shape: Shape | None) -> bool:
+    return shape is None or not shape.faces()
+
+def rectangle(part: Dict, name: str, points: Dict[str, Point], outlines: Dict[str, Shape], units: Dict[str, float]) -> tuple[Shape, Dict[str, float]]:
+    width, height = size(part.get('size', 18), units)
+    units = {**units, 'sx': width, 'sy': height}
+    corner = evaluate_expression(part.get('corner', 0), units)
+    return (RectangleRounded(width, height, corner) if corner else Rectangle(width, height)), units
+
+def circle(part: Dict, name: str, points: Dict[str, Point], outlines: Dict[str, Shape], units: Dict[str, float]) -> tuple[Shape, Dict[str, float]]:
+    radius = evaluate_expression(part['radius'], units)
+    return Circle(radius), {**units, 'r': radius}
+
+def polygon(part: Dict, name: str, points: Dict[str, Point], outlines: Dict[str, Shape], units: Dict[str, float]) -> tuple[Shape, Dict[str, float]]:
+    # every corner is relative to the previous one
+    corner = Point()
+    corners = []
+    for i, raw in enumerate(part['points'], start=1):
+        corner = parse_anchor(raw, f"{name}.points[{i}]", points, corner, units)
+        corners.append((corner.p.X, corner.p.Y))
+    return Polygon(*corners, align=None), units
+
+def outline(part: Dict, name: str, points: Dict[str, Point], outlines: Dict[str, Shape], units: Dict[str, float]) -> tuple[Shape, Dict[str, float]]:
+    if part.get('name') not in outlines:
+        raise ValueError(f"'{name}.name' does not name an existing outline: '{part.get('name')}'")
+    origin = parse_anchor(part.get('origin', {}), f"{name}.origin", points, Point(), units)
+    return unposition(outlines[part['name']], origin), units
+
+SHAPES = {
+    'rectangle': rectangle,
+    'circle': circle,
+    'polygon': polygon,
+    'outline': outline,
+}
+
+def fillet(shape: Shape, radius: float) -> Shape:
+    """Round every corner of a shape: closing rounds the concave corners, opening the convex ones."""
+    closed = offset(offset(shape, radius, kind=Kind.ARC), -radius, kind=Kind.ARC)
+    return offset(offset(closed, -radius, kind=Kind.ARC), radius, kind=Kind.ARC)
+
+def as_shape(result: Shape | list[Shape]) -> Shape:
+    # booleans of two faces may return a plain list of faces
+    return Compound(list(result)) if isinstance(result, list) else result
+
+def combine(result: Shape | None, shape: Shape | None, operation: str) -> Shape | None:
+    if is_empty(shape):
+        return None if operation == 'intersect' else result
+    if is_empty(result):
+        return shape if operation in ('add', 'stack') else None
+    if operation == 'add':
+        return as_shape(result + shape)
+    if operation == 'subtract':
+        return as_shape(result - shape)
+    if operation == 'intersect':
+        return as_shape(result & shape)
+    if operation == 'stack':
+        # overlapping shapes stay separate instead of being merged
+        return Compound(children=[*result.faces(), *shape.faces()])
+    raise ValueError(f"Unknown outline operation '{operation}'")
+
+def expand_part(part: Any) -> Dict:
+    """Turn the '-_name' style shorthand into a full outline part."""
+    if isinstance(part, dict):
+        return part
+    part = str(part)
+    operation = OPERATIONS.get(part[0])
+    return {'what': 'outline', 'name': part[1:] if operation else part, 'operation': operation or 'add'}
+
+def render_outline(outline_name: str, parts: Any, points: Dict[str, Point], outlines: Dict[str, Shape], units: Dict[str, float]) -> Shape | None:
+    parts = parts.items() if isinstance(parts, dict) else enumerate(parts if isinstance(parts, list) else [parts], start=1)
+    result = None
+    for part_name, part in parts:
+        part = expand_part(part)
+        name = f"outlines.{outline_name}.{part_name}"
+        what = part.get('what', 'outline')
+        if what not in SHAPES:
+            raise ValueError(f"Unknown shape '{what}' in '{name}', expected one of {list(SHAPES)}")
+        shape, shape_units = SHAPES[what](part, name, points, outlines, units)
+
+        placed = None
+        for point in parse_where(part.get('where'), f"{name}.where", points, units, part.get('asym', 'source')):
+            point = parse_anchor(part.get('adjust', {}), f"{name}.adjust", points, point, shape_units)
+            placed = combine(placed, position(shape, point), 'add')
+
+        if radius := evaluate_expression(part.get('fillet', 0), shape_units):
+            if not is_empty(placed):
+                placed = fillet(placed, radius)
+
+        result = combine(result, placed, part.get('operation', 'add'))
+    return result
+
+def parse_outlines(config: Dict, points: Dict[str, Point], units: Dict[str, float]) -> Dict[str, Shape | None]:
+    """Render every outline of a normalized config. Outlines may only refer to the ones before them."""
+    outlines: Dict[str, Shape | None] = {}
+    for name, parts in (config.get('outlines') or {}).items():
+        outlines[name] = render_outline(name, parts, points, outlines, units)
+    return outlines
+
+def outlines_from_config(config: Dict, backend: str = 'build123d') -> Dict[str, Shape | None]:
+    units = ergogen.parse_units(config)
+    points = ergogen.parse_points(config.get('points', {}), units, backend)
+    return parse_outlines(config, points, units)
+
+def export_outlines(outlines: Dict[str, Shape | None], directory: str, formats: tuple[str, ...] = ('svg',)) -> list[str]:
+    """Write every non-helper outline as SVG and/or DXF. Returns the written paths."""
+    exporters = {'svg': ExportSVG, 'dxf': ExportDXF}
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for name, shape in outlines.items():
+        if name.startswith('_') or is_empty(shape):
+            continue
+        for fmt in formats:
+            exporter = exporters[fmt]()
+            exporter.add_shape(shape)
+            path = os.path.join(directory, f"{name}.{fmt}")
+            exporter.write(path)
+            written.append(path)
+    return written
+
+
+# main method
+if __name__ == "__main__":
+    import time
+
+    config_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'particle', 'case', 'config', 'duality_keyboard.yaml')
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(os.path.abspath(config_path)), '..', 'generated_files', 'outlines')
+    formats = tuple(sys.argv[3].split(',')) if len(sys.argv) > 3 else ('svg',)
+
+    start = time.perf_counter()
+    config = ergogen.normalize_config(ergogen.load_config(config_path))
+    outlines = outlines_from_config(config)
+    for path in export_outlines(outlines, output_dir, formats):
+        print(f"Wrote {path}")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
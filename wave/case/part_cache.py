@@ -0,0 +1,260 @@
+"""On-disk cache for the parts of a case.
+
+Methods decorated with cached_part store what they return as BREP files, keyed by a hash
+of the case modules' source, of their owner's cache_inputs() (switch, key points, outline
+parameters, ...), of their arguments, and of the fields of the owner's dims they read the
+last time they ran. That last part is recorded per method in a small manifest, so changing
+a dimension only rebuilds the parts that actually use it. Entries that weren't used for the
+longest time are removed once the cache grows beyond its size limit.
+"""
+import dataclasses
+import functools
+import glob
+import hashlib
+import inspect
+import io
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict
+
+from build123d import Compound, Location, Part, Plane, Shape, Vector, export_brep
+from OCP.BRep import BRep_Builder
+from OCP.BRepTools import BRepTools
+from OCP.TopoDS import TopoDS_Shape
+
+from ergogen import Point
+
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'duality_keyboard', 'parts')
+MAX_BYTES = 256 * 1024 * 1024
+
+CASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def part_to_brep(part: Shape) -> bytes:
+    # text BREP, the binary format of build123d.persistence can't read some of our parts back
+    buffer = io.BytesIO()
+    export_brep(part, buffer)
+    return buffer.getvalue()
+
+def part_from_brep(data: bytes) -> Part:
+    shape = TopoDS_Shape()
+    BRepTools.Read_s(shape, io.BytesIO(data), BRep_Builder())
+    if shape.IsNull():
+        raise ValueError("Can't read part from BREP")
+    return Part(Compound.cast(shape).wrapped)
+
+@functools.lru_cache(maxsize=None)
+def source_version() -> str:
+    """Hash of every module that goes into building a part: the case generator, the models,
+    the outline polygons, how tools are collected and shared, and this cache itself.
+    Class level dimensions like Xiao.dims or Pin.dims are covered by this, too."""
+    paths = [os.path.join(CASE_DIR, name) for name in ('wave_generator.py', 'polygons.py', 'part_tools.py', 'part_cache.py')]
+    paths += sorted(glob.glob(os.path.join(CASE_DIR, 'models', '*.py')))
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def fingerprint(value: Any, shapes: bool = True) -> Any:
+    """A JSON-compatible stand-in for a value that only depends on its content. Raises TypeError
+    for anything it can't vouch for, rather than hashing an object's identity, and for shapes
+    unless they're allowed."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Vector):
+        return {'$vector': [value.X, value.Y, value.Z]}
+    if isinstance(value, Location):
+        return {'$location': [fingerprint(value.position), fingerprint(value.orientation)]}
+    if isinstance(value, Plane):
+        return {'$plane': [fingerprint(value.origin), fingerprint(value.x_dir), fingerprint(value.z_dir)]}
+    if isinstance(value, Point):
+        return {'$point': [fingerprint(value.p), value.r, value.meta.name if value.meta else None]}
+    if isinstance(value, Shape) and shapes:
+        # only stable for shapes that were read from BREP, like everything PartCache returns
+        return {'$shape': hashlib.sha256(part_to_brep(value)).hexdigest()}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {'$' + type(value).__name__: {f.name: fingerprint(getattr(value, f.name), shapes) for f in dataclasses.fields(value)}}
+    if isinstance(value, (list, tuple)):
+        return [fingerprint(v, shapes) for v in value]
+    if isinstance(value, dict):
+        return {str(k): fingerprint(v, shapes) for k, v in value.items()}
+    raise TypeError(f"Can't fingerprint {type(value).__name__} for the part cache")
+
+def public_values(obj: Any) -> Dict[str, Any]:
+    """The public attributes of an object (class level ones included) that can be fingerprinted,
+    e.g. a switch's dimension dataclasses or an outline's corners. Anything holding models or
+    sketches is skipped, those are derived from the other attributes."""
+    values = {}
+    for name, value in inspect.getmembers(obj):
+        if name.startswith('_') or callable(value):
+            continue
+        try:
+            values[name] = fingerprint(value, shapes=False)
+        except TypeError:
+            continue
+    return {'$type': type(obj).__name__, **values}
+
+def digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+class DimsRecorder:
+    """Stands in for a dims object and remembers which of its attributes get read."""
+    def __init__(self, dims: Any, read: set[str]):
+        object.__setattr__(self, 'dims', dims)
+        object.__setattr__(self, 'read', read)
+
+    def __getattr__(self, name: str) -> Any:
+        self.read.add(name)
+        return getattr(self.dims, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Cached parts must not change dims.{name}")
+
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+class PartCache:
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_BYTES, verbose: bool = False):
+        """verbose prints every part that is loaded instead of built."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.verbose = verbose
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str, extension: str = 'brep') -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def call(self, method: Callable, owner: Any, args: tuple, kwargs: Dict[str, Any]) -> Part:
+        """Return method(owner, *args, **kwargs) from the cache, or build and store it."""
+        # bound by name, so passing an argument by position or by keyword makes no difference
+        arguments = inspect.signature(method).bind(owner, *args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(list(arguments.arguments.items())[1:])
+        base = digest([source_version(), method.__qualname__, fingerprint(owner.cache_inputs()), fingerprint(arguments)])
+        dims = getattr(owner, 'dims', None)
+        fields = self.read_fields(base) if dims is not None else []
+        if fields is not None:
+            part = self.load(self.key(base, dims, fields))
+            if part is not None:
+                self.hits += 1
+                print(f"Using cached {method.__qualname__}") if self.verbose else None
+                return part
+
+        self.misses += 1
+        read: set[str] = set()
+        if dims is not None:
+            owner.dims = DimsRecorder(dims, read)
+        try:
+            part = method(owner, *args, **kwargs)
+        finally:
+            if dims is not None:
+                owner.dims = dims
+
+        fields = sorted(read)
+        data = part_to_brep(part)
+        self.write(self.path(self.key(base, dims, fields)), data)
+        if dims is not None:
+            self.write(self.path(base, 'fields'), json.dumps(fields).encode())
+        self.evict()
+        # reading normalizes the geometry slightly, hand out the same part a hit would
+        return part_from_brep(data)
+
+    def key(self, base: str, dims: Any, fields: list[str]) -> str:
+        return digest([base, {name: fingerprint(getattr(dims, name, None)) for name in fields}])
+
+    def read_fields(self, base: str) -> list[str] | None:
+        try:
+            with open(self.path(base, 'fields'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, key: str) -> Part | None:
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # the modification time is what eviction goes by
+            os.utime(path)
+            return part_from_brep(data)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, path: str, content: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # write to a temporary file first so that concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def entries(self) -> list[os.DirEntry]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [e for e in os.scandir(self.directory) if e.name.endswith('.brep')]
+
+    def evict(self) -> int:
+        """Remove the least recently used entries until the cache fits into max_bytes.
+        Returns the number of removed entries."""
+        entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in self.entries()), reverse=True)
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        while entries and total > self.max_bytes:
+            _, size, path = entries.pop()
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+    def stats(self) -> CacheStats:
+        """Hits and misses of this instance, plus the number and total size of the entries on disk."""
+        entries = self.entries()
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            entries=len(entries),
+            size_bytes=sum(e.stat().st_size for e in entries))
+
+    def invalidate(self) -> int:
+        """Remove every entry. Returns the number of removed entries."""
+        paths = [e.path for e in os.scandir(self.directory) if e.name.endswith(('.brep', '.fields'))] if os.path.isdir(self.directory) else []
+        removed = 0
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += path.endswith('.brep')
+            except FileNotFoundError:
+                pass
+        return removed
+
+def cached_part(method: Callable) -> Callable:
+    """Cache a part building method in its owner's part_cache, if it has one.
+    The owner provides cache_inputs(), everything besides dims and the arguments that the part depends on."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, 'part_cache', None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+        return cache.call(method, self, args, kwargs)
+    return wrapper
+
+default_cache = PartCache()
+
+
+# main method
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'invalidate':
+        print(f"Removed {default_cache.invalidate()} cache entries")
+    else:
+        print(default_cache.stats())
@@ -0,0 +1,97 @@
+"""Tool solids for the case parts.
+
+Every extrude with Mode.SUBTRACT or Mode.ADD is a full boolean on a part that gets more
+complex with every feature. A ToolCollector defers those extrudes and applies a run of them
+as one boolean with many tools, which OCCT handles in a single pass over the part.
+A ToolRegistry holds the tools that several parts are cut with, so they're built only once.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from build123d import BuildPart, Mode, Part, extrude
+
+from part_cache import fingerprint
+
+class ToolCollector:
+    """Collects the tool solids of a BuildPart and adds or subtracts them together.
+    Use it as a context manager inside the BuildPart, and flush() before anything that
+    looks at the part, like selecting its faces or filleting its edges. Disabled, it
+    applies every tool right away like a plain extrude."""
+    def __init__(self, builder: BuildPart | None, enabled: bool = True):
+        self.builder = builder
+        self.enabled = enabled
+        self.mode: Mode | None = None
+        self.tools: list[Part] = []
+
+    def extrude(self, *args, mode: Mode = Mode.ADD, **kwargs) -> Part:
+        """build123d's extrude, with Mode.ADD and Mode.SUBTRACT deferred until the next flush.
+        Returns the tool like extrude does."""
+        if not self.enabled or mode not in (Mode.ADD, Mode.SUBTRACT):
+            return extrude(*args, mode=mode, **kwargs)
+        tool = extrude(*args, mode=Mode.PRIVATE, **kwargs)
+        self.collect(tool, mode)
+        return tool
+
+    def collect(self, tool: Part, mode: Mode) -> None:
+        """Add or subtract a tool solid, e.g. one from a ToolRegistry, with the next flush."""
+        # adding and subtracting don't commute, so a change of mode applies what's collected so far
+        if mode != self.mode:
+            self.flush()
+        self.mode = mode
+        self.tools.append(tool)
+        if not self.enabled:
+            self.flush()
+
+    def flush(self) -> None:
+        """Apply the collected tools to the BuildPart in one boolean."""
+        if self.tools:
+            # the way extrude itself adds its solids, add() would move them and their
+            # edges would no longer be the part's edges, e.g. for a fillet
+            self.builder._add_to_context(*[solid for tool in self.tools for solid in tool.solids()], mode=self.mode)
+        self.tools = []
+        self.mode = None
+
+    def __enter__(self) -> 'ToolCollector':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.flush()
+
+@dataclass
+class ToolStats:
+    uses: int = 0
+    builds: int = 0
+    build_time: float = 0.0
+
+class ToolRegistry:
+    """Named tool solids, each built on first use and then shared by every part that uses it.
+    A tool gets rebuilt when the inputs it's requested with change. Passing everything the tool
+    depends on as inputs also lets a part cache see them being read by every part using the tool."""
+    def __init__(self):
+        self.tools: Dict[str, tuple[Any, Part]] = {}
+        self.stats: Dict[str, ToolStats] = {}
+
+    def get(self, name: str, build: Callable[[], Part], inputs: Any = None) -> Part:
+        key = fingerprint(inputs, shapes=False)
+        stats = self.stats.setdefault(name, ToolStats())
+        if name not in self.tools or self.tools[name][0] != key:
+            start = time.perf_counter()
+            self.tools[name] = (key, build())
+            stats.builds += 1
+            stats.build_time += time.perf_counter() - start
+        stats.uses += 1
+        return self.tools[name][1]
+
+    def merge(self, stats: Dict[str, ToolStats]) -> None:
+        """Add the stats of another registry, e.g. one from a worker process."""
+        for name, other in stats.items():
+            own = self.stats.setdefault(name, ToolStats())
+            own.uses += other.uses
+            own.builds += other.builds
+            own.build_time += other.build_time
+
+    def report(self) -> str:
+        """One line per tool with how often it was used and built, and how long building took."""
+        return '\n'.join(f"  {name}: used {s.uses}x, built {s.builds}x in {s.build_time:.2f}s" for name, s in self.stats.items())
@@ -0,0 +1,191 @@
+"""On-disk cache for parsed ergogen points.
+
+Entries are keyed by a hash of the normalized config and of the parser's own source,
+so editing comments or formatting in the YAML doesn't invalidate anything, while any
+change to the layout or to the parser does. A small alias file per raw file content
+points to the entry, so an unchanged file doesn't even need to be parsed as YAML.
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import yaml
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict
+
+from build123d import Vector
+
+import ergogen
+import expressions
+from ergogen import KeyMeta, Point, Zone
+
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'duality_keyboard', 'points')
+
+@lru_cache(maxsize=None)
+def parser_version() -> str:
+    """Hash of every module that affects parsed points, including the serialization below."""
+    digest = hashlib.sha256()
+    for path in (ergogen.__file__, expressions.__file__, __file__):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def config_key(config: Dict, backend: str) -> str:
+    content = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(f"{parser_version()}\n{backend}\n{content}".encode()).hexdigest()
+
+def raw_key(content: bytes, backend: str) -> str:
+    return hashlib.sha256(f"{parser_version()}\n{backend}\n".encode() + content).hexdigest()
+
+def encode_value(value: Any) -> Any:
+    if isinstance(value, Vector):
+        return {'$vector': [value.X, value.Y, value.Z]}
+    if isinstance(value, dict):
+        return {k: encode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [encode_value(v) for v in value]
+    return value
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if '$vector' in value:
+            return Vector(*value['$vector'])
+        return {k: decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    return value
+
+def serialize_points(points: Dict[str, Point]) -> Dict:
+    """Serialize points to JSON-compatible data, with each zone config stored once."""
+    zones = {}
+    serialized = {}
+    for name, point in points.items():
+        meta = point.meta
+        if meta is None:
+            serialized[name] = [point.p.X, point.p.Y, point.r, None]
+            continue
+        zones[meta.zone.name] = encode_value(meta.zone.config)
+        serialized[name] = [point.p.X, point.p.Y, point.r, [meta.name, meta.zone.name, meta.column, meta.row, meta.width, meta.height, meta.skip, meta.asym, meta.mirrored]]
+    return {'zones': zones, 'points': serialized}
+
+def deserialize_points(data: Dict) -> Dict[str, Point]:
+    zones = {name: Zone(sys.intern(name), decode_value(config)) for name, config in data['zones'].items()}
+    points = {}
+    for name, (x, y, r, meta) in data['points'].items():
+        if meta is not None:
+            key_name, zone, column, row, width, height, skip, asym, mirrored = meta
+            meta = KeyMeta(sys.intern(key_name), zones[zone], sys.intern(column), sys.intern(row), width, height, skip, asym, mirrored)
+        points[name] = Point(p=Vector(x, y), r=r, meta=meta)
+    return points
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+class PointsCache:
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str, extension: str = 'json') -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def load(self, key: str) -> Dict[str, Point] | None:
+        try:
+            with open(self.path(key), 'r') as f:
+                return deserialize_points(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def get_points(self, file_path: str, backend: str = 'build123d') -> Dict[str, Point]:
+        """Drop-in replacement for ergogen.get_points that only parses points on a cache miss."""
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        alias = self.path(raw_key(content, backend), 'alias')
+        try:
+            with open(alias, 'r') as f:
+                points = self.load(f.read().strip())
+        except OSError:
+            points = None
+        if points is not None:
+            self.hits += 1
+            return points
+
+        config = ergogen.normalize_config(yaml.safe_load(content))
+        key = config_key(config, backend)
+        points = self.load(key)
+        if points is None:
+            self.misses += 1
+            points = ergogen.points_from_config(config, backend)
+            self.write(self.path(key), json.dumps(serialize_points(points), separators=(',', ':'), default=str))
+        else:
+            self.hits += 1
+        self.write(alias, key)
+        return points
+
+    def write(self, path: str, content: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # write to a temporary file first so that concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def stats(self) -> CacheStats:
+        """Hits and misses of this instance, plus the number and total size of the entries on disk."""
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith('.json')] if os.path.isdir(self.directory) else []
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            entries=len(entries),
+            size_bytes=sum(e.stat().st_size for e in entries))
+
+    def invalidate(self, file_path: str | None = None, backend: str = 'build123d') -> int:
+        """Remove the entry for a config file, or every entry if no file is given.
+        Returns the number of removed entries."""
+        if file_path is not None:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            config = ergogen.normalize_config(yaml.safe_load(content))
+            paths = [self.path(config_key(config, backend)), self.path(raw_key(content, backend), 'alias')]
+        elif os.path.isdir(self.directory):
+            paths = [e.path for e in os.scandir(self.directory) if e.name.endswith(('.json', '.alias'))]
+        else:
+            paths = []
+
+        removed = 0
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += path.endswith('.json')
+            except FileNotFoundError:
+                pass
+        return removed
+
+default_cache = PointsCache()
+
+def get_points(file_path: str = None, backend: str = 'build123d') -> Dict[str, Point]:
+    return default_cache.get_points(file_path, backend)
+
+def cache_stats() -> CacheStats:
+    return default_cache.stats()
+
+def invalidate(file_path: str | None = None, backend: str = 'build123d') -> int:
+    return default_cache.invalidate(file_path, backend)
+
+
+# main method
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'invalidate':
+        print(f"Removed {invalidate(*sys.argv[2:3])} cache entries")
+    else:
+        print(cache_stats())
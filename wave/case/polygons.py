@@ -0,0 +1,175 @@
+"""Small 2D polygon kernel for key footprints.
+
+The keywell outline is a union of a few dozen rotated rectangles. Doing that on plain
+coordinates takes milliseconds, where fusing the same rectangles as OCCT faces takes
+most of a second. Polygons are (n, 2) arrays of corners, counter-clockwise for outer
+boundaries and clockwise for holes; only the final result is turned into a Sketch.
+"""
+import math
+from typing import Iterable
+
+import numpy as np
+from build123d import Edge, Face, GeomType, Sketch, Vector, Wire
+
+# distances below this are treated as zero, in mm
+TOLERANCE = 1e-6
+
+def rectangle(center: Vector, width: float, height: float, rotation: float = 0) -> np.ndarray:
+    """Corners of a centered rectangle rotated by degrees, like build123d's Rectangle at a Location."""
+    c, s = math.cos(math.radians(rotation)), math.sin(math.radians(rotation))
+    corners = np.array([(-width, -height), (width, -height), (width, height), (-width, height)]) / 2
+    return corners @ np.array([[c, s], [-s, c]]) + (center.X, center.Y)
+
+def cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+def signed_area(polygon: np.ndarray) -> float:
+    """Positive for counter-clockwise polygons."""
+    return float(cross(polygon, np.roll(polygon, -1, axis=0)).sum() / 2)
+
+def contains(polygon: np.ndarray, point: np.ndarray) -> bool:
+    """Even-odd test, for any simple polygon."""
+    return segments_contain(polygon, np.roll(polygon, -1, axis=0), point)
+
+def segments_contain(starts: np.ndarray, ends: np.ndarray, point: np.ndarray) -> bool:
+    """Even-odd test against the closed boundary made up by the segments, in any order."""
+    x, y = point
+    crossing = (starts[:, 1] > y) != (ends[:, 1] > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        at_x = starts[:, 0] + (y - starts[:, 1]) * (ends[:, 0] - starts[:, 0]) / (ends[:, 1] - starts[:, 1])
+    return bool(np.count_nonzero(crossing & (x < at_x)) % 2)
+
+def distance_to_segments(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Distance of every point to the nearest of the segments."""
+    directions = ends - starts
+    squared = np.maximum((directions ** 2).sum(axis=1), TOLERANCE ** 2)
+    offsets = points[:, None, :] - starts[None, :, :]
+    t = np.clip((offsets * directions[None, :, :]).sum(axis=-1) / squared, 0, 1)
+    nearest = starts[None, :, :] + t[..., None] * directions[None, :, :]
+    return np.linalg.norm(points[:, None, :] - nearest, axis=-1).min(axis=1)
+
+def split_parameters(starts: np.ndarray, directions: np.ndarray) -> list[np.ndarray]:
+    """Per edge, the sorted parameters in [0, 1] where other edges cross it or where
+    collinear edges that overlap it begin or end."""
+    lengths = np.linalg.norm(directions, axis=1)
+    offsets = starts[None, :, :] - starts[:, None, :]  # [i, j] = start j - start i
+    denominators = cross(directions[:, None, :], directions[None, :, :])
+    parallel = np.abs(denominators) <= TOLERANCE * lengths[:, None] * lengths[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = cross(offsets, directions[None, :, :]) / denominators
+        u = cross(offsets, directions[:, None, :]) / denominators
+    margin = TOLERANCE / lengths
+    crossing = ~parallel & (t >= -margin[:, None]) & (t <= 1 + margin[:, None]) & (u >= -margin[None, :]) & (u <= 1 + margin[None, :])
+
+    collinear = parallel & (np.abs(cross(directions[:, None, :], offsets)) <= TOLERANCE * lengths[:, None])
+    squared = (lengths ** 2)[:, None]
+    along_start = (offsets * directions[:, None, :]).sum(axis=-1) / squared
+    along_end = ((offsets + directions[None, :, :]) * directions[:, None, :]).sum(axis=-1) / squared
+
+    result = []
+    for i in range(len(starts)):
+        candidates = np.concatenate(([0.0, 1.0], t[i, crossing[i]], along_start[i, collinear[i]], along_end[i, collinear[i]]))
+        candidates = np.sort(np.clip(candidates[(candidates >= 0) & (candidates <= 1)], 0, 1))
+        keep = np.concatenate(([True], np.diff(candidates) * lengths[i] > TOLERANCE))
+        result.append(candidates[keep])
+    return result
+
+def point_key(point: np.ndarray) -> tuple[int, int]:
+    return (round(point[0] / TOLERANCE), round(point[1] / TOLERANCE))
+
+def simplify(loop: np.ndarray) -> np.ndarray:
+    """Drop corners that lie on a straight line between their neighbours."""
+    previous, following = np.roll(loop, 1, axis=0), np.roll(loop, -1, axis=0)
+    deviation = np.abs(cross(loop - previous, following - loop))
+    return loop[deviation > TOLERANCE * np.linalg.norm(following - previous, axis=1)]
+
+def union(polygons: Iterable[np.ndarray]) -> list[np.ndarray]:
+    """Boundary loops of the union of convex counter-clockwise polygons.
+    Every edge is split where other edges cross it, and the pieces that lie inside
+    another polygon are dropped. What's left gets chained into loops: outer boundaries
+    come out counter-clockwise, holes clockwise."""
+    polygons = [np.asarray(p, dtype=float) for p in polygons]
+    if not polygons:
+        return []
+    starts = np.concatenate(polygons)
+    directions = np.concatenate([np.roll(p, -1, axis=0) for p in polygons]) - starts
+    first_edges = np.cumsum([0] + [len(p) for p in polygons[:-1]])
+
+    pieces_start, pieces_end = [], []
+    for start, direction, parameters in zip(starts, directions, split_parameters(starts, directions)):
+        pieces_start.append(start + parameters[:-1, None] * direction)
+        pieces_end.append(start + parameters[1:, None] * direction)
+    pieces_start, pieces_end = np.concatenate(pieces_start), np.concatenate(pieces_end)
+
+    # signed distance of every piece's midpoint to every edge, positive on the inner side
+    midpoints = (pieces_start + pieces_end) / 2
+    distances = cross(directions[None, :, :], midpoints[:, None, :] - starts[None, :, :]) / np.linalg.norm(directions, axis=1)
+    inside = np.minimum.reduceat(distances, first_edges, axis=1) > TOLERANCE
+    outside = ~inside.any(axis=1)
+
+    # pieces shared by touching polygons run both ways and cancel out,
+    # pieces shared by overlapping ones run the same way and are kept once
+    segments: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+    for start, end in zip(pieces_start[outside], pieces_end[outside]):
+        key = (point_key(start), point_key(end))
+        if key[0] == key[1]:
+            continue
+        if key[::-1] in segments:
+            del segments[key[::-1]]
+        else:
+            segments[key] = (start, end)
+
+    following: dict[tuple, list[tuple]] = {}
+    coordinates = {}
+    for (start, end), (start_point, _) in segments.items():
+        following.setdefault(start, []).append(end)
+        coordinates[start] = start_point
+
+    loops = []
+    while following:
+        first = next(iter(following))
+        loop, current = [first], first
+        while True:
+            ends = following.get(current)
+            if not ends:
+                raise ValueError(f"Union boundary is not closed near {coordinates[current]}")
+            nxt = ends.pop()
+            if not ends:
+                del following[current]
+            if nxt == first:
+                break
+            loop.append(nxt)
+            current = nxt
+        loops.append(simplify(np.array([coordinates[k] for k in loop])))
+    return [loop for loop in loops if len(loop) >= 3]
+
+def fill_holes(loops: list[np.ndarray], min_area: float) -> list[np.ndarray]:
+    """Drop holes smaller than min_area, which fills them."""
+    return [loop for loop in loops if signed_area(loop) > 0 or -signed_area(loop) >= min_area]
+
+def to_sketch(loops: list[np.ndarray]) -> Sketch:
+    """One face per outer boundary, with every hole assigned to the smallest boundary around it."""
+    outers = sorted((loop for loop in loops if signed_area(loop) > 0), key=signed_area)
+    holes: list[list[np.ndarray]] = [[] for _ in outers]
+    for loop in loops:
+        if signed_area(loop) < 0:
+            container = next((i for i, outer in enumerate(outers) if contains(outer, loop[0])), None)
+            if container is None:
+                raise ValueError(f"Hole at {loop[0]} lies outside of every boundary")
+            holes[container].append(loop)
+
+    def wire(loop: np.ndarray) -> Wire:
+        return Wire.make_polygon([(x, y) for x, y in loop], close=True)
+
+    return Sketch([Face(wire(outer), [wire(hole) for hole in inner]) for outer, inner in zip(outers, holes)])
+
+def edge_segments(edges: Iterable[Edge], arc_segments: int = 8) -> tuple[np.ndarray, np.ndarray]:
+    """Starts and ends of straight segments approximating the edges. Curved edges are split
+    into arc_segments chords, close enough for fillets of a millimeter or so."""
+    starts, ends = [], []
+    for edge in edges:
+        count = 1 if edge.geom_type == GeomType.LINE else arc_segments
+        points = [(v.X, v.Y) for v in edge.positions(np.linspace(0, 1, count + 1))]
+        starts.extend(points[:-1])
+        ends.extend(points[1:])
+    return np.array(starts, dtype=float).reshape(-1, 2), np.array(ends, dtype=float).reshape(-1, 2)
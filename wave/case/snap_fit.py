@@ -2,8 +2,6 @@ from dataclasses import dataclass, field, InitVar
 import math
 import copy
 
-from sympy import shape
-
 from wave_generator import WaveCase
 from build123d import *
 from models.choc import Choc
@@ -21,6 +19,7 @@ from models.model_types import RoundDimensions, PosAndDims, RectDimensions
 from ocp_vscode import *
 
 from models.outline import Outline
+from part_cache import PartCache
 from models.model_types import WaveDimensions
 
 @dataclass
@@ -98,7 +97,7 @@ if __name__ == "__main__":
     keys = ErgoKeys(points=points)
     outline = Outline(switch=switch, keys=keys, wall_thickness=CaseDimensions.wall_thickness, additional_top_space=22)
     dims = CaseDimensions(switch=switch, outline=outline, keys=keys)
-    case = WaveCase(switch=switch, keys=keys, caseDimensions=dims, outline=outline, debug=True, both_sides=False)
+    case = WaveCase(switch=switch, keys=keys, caseDimensions=dims, outline=outline, debug=True, both_sides=False, part_cache=PartCache(verbose=True))
     show_clear()
     set_defaults(ortho=True, default_edgecolor="#121212", reset_camera=Camera.KEEP)
     set_colormap(ColorMap.seeded(colormap="rgb", alpha=1, seed_value="wave"))
@@ -0,0 +1,127 @@
+"""Parameter sweeps over ergogen configs.
+
+Evaluates many unit overrides of one base config in a process pool, e.g. to scan
+thumb and pinky rotations before committing to a CAD build. Every worker parses the
+base config once and lays out each variant incrementally with ergogen.update_points,
+so only the zones that actually use a swept unit get rendered again.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+import numpy as np
+from build123d import Axis, Vector
+
+import ergogen
+from ergogen import Point
+from points_cache import deserialize_points, serialize_points
+
+Metric = Callable[[Dict[str, Point]], Any]
+
+def grid(**axes: Iterable) -> list[Dict[str, Any]]:
+    """All combinations of the given unit values, e.g. grid(thumb_rotation=[-10, -8], pinky_rotation=[6, 8])."""
+    names = list(axes.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+def as_variants(variants: Dict[str, Iterable] | Iterable[Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """Accept either a grid (unit name -> values) or an explicit list of overrides."""
+    if isinstance(variants, dict):
+        return grid(**variants)
+    return list(variants)
+
+def apply_overrides(config: Dict, overrides: Dict[str, Any]) -> Dict:
+    """Return a copy of a normalized config with some units replaced. Units derived from them follow along."""
+    config = dict(config)
+    for name, value in overrides.items():
+        section = 'variables' if name in config.get('variables', {}) else 'units'
+        config[section] = {**config.get(section, {}), name: value}
+    return config
+
+def key_corners(points: Dict[str, Point]) -> np.ndarray:
+    """Corners of every key's footprint, shape (keys, 4, 2)."""
+    corners = []
+    for point in points.values():
+        w = (point.meta.width if point.meta else 18) / 2
+        h = (point.meta.height if point.meta else 18) / 2
+        corners.append([(point.p + Vector(x, y).rotate(Axis.Z, point.r)).to_tuple()[:2] for x, y in ((-w, -h), (w, -h), (w, h), (-w, h))])
+    return np.array(corners).reshape(-1, 4, 2)
+
+def bounding_box(points: Dict[str, Point]) -> tuple[float, float, float, float]:
+    """(min_x, min_y, max_x, max_y) of all key footprints."""
+    corners = key_corners(points).reshape(-1, 2)
+    if len(corners) == 0:
+        return (0.0, 0.0, 0.0, 0.0)
+    (min_x, min_y), (max_x, max_y) = corners.min(axis=0), corners.max(axis=0)
+    return (float(min_x), float(min_y), float(max_x), float(max_y))
+
+def min_distance(points: Dict[str, Point]) -> float:
+    """Smallest distance between the centers of any two keys."""
+    centers = np.array([(p.p.X, p.p.Y) for p in points.values()])
+    if len(centers) < 2:
+        return float('inf')
+    distances = np.linalg.norm(centers[:, None, :] - centers[None, :, :], axis=-1)
+    np.fill_diagonal(distances, np.inf)
+    return float(distances.min())
+
+DEFAULT_METRICS: Dict[str, Metric] = {
+    'bounding_box': bounding_box,
+    'min_distance': min_distance,
+}
+
+# state of a worker process, set up once by init_worker
+worker: Dict[str, Any] = {}
+
+def init_worker(file_path: str, backend: str, metrics: Dict[str, Metric] | None) -> None:
+    config = ergogen.normalize_config(ergogen.load_config(file_path))
+    worker.update(
+        config=config,
+        points=ergogen.points_from_config(config, backend),
+        backend=backend,
+        metrics=metrics)
+
+def evaluate_variant(overrides: Dict[str, Any]) -> tuple[Dict[str, Any], Any]:
+    """Lay out one variant. Returns serialized points, or only the metrics if any were requested,
+    which keeps the data sent back to the parent small."""
+    config = apply_overrides(worker['config'], overrides)
+    points = ergogen.update_points(worker['config'], worker['points'], config, worker['backend'])
+    if worker['metrics'] is not None:
+        return overrides, {name: metric(points) for name, metric in worker['metrics'].items()}
+    # build123d vectors can't be pickled
+    return overrides, serialize_points(points)
+
+def run(file_path: str, variants, backend: str, processes: int | None, metrics: Dict[str, Metric] | None, chunksize: int) -> Iterator[tuple[Dict[str, Any], Any]]:
+    variants = as_variants(variants)
+    if processes == 1:
+        init_worker(file_path, backend, metrics)
+        yield from map(evaluate_variant, variants)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=(file_path, backend, metrics)) as pool:
+        yield from pool.map(evaluate_variant, variants, chunksize=chunksize)
+
+def sweep(file_path: str, variants, backend: str = 'build123d', processes: int | None = None, chunksize: int = 4) -> Iterator[tuple[Dict[str, Any], Dict[str, Point]]]:
+    """Lay out every variant of a base config and yield (overrides, points) in the order of the variants.
+    variants is either a grid (unit name -> values) or a list of overrides. processes=1 runs in-process."""
+    for overrides, data in run(file_path, variants, backend, processes, None, chunksize):
+        yield overrides, deserialize_points(data)
+
+def sweep_metrics(file_path: str, variants, metrics: Dict[str, Metric] = DEFAULT_METRICS, backend: str = 'build123d', processes: int | None = None, chunksize: int = 16) -> Iterator[tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Like sweep, but compute the metrics in the workers and yield (overrides, {metric name: value}).
+    Metrics must be picklable, i.e. module level functions."""
+    yield from run(file_path, variants, backend, processes, metrics, chunksize)
+
+
+# main method
+if __name__ == "__main__":
+    import time
+
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'particle', 'case', 'config', 'duality_keyboard.yaml')
+    variants = grid(thumb_rotation=range(-20, 1), pinky_rotation=range(0, 16))
+
+    start = time.perf_counter()
+    results = list(sweep_metrics(config_path, variants))
+    print(f"Evaluated {len(results)} variants in {time.perf_counter() - start:.2f}s")
+
+    overrides, values = max(results, key=lambda result: result[1]['min_distance'])
+    print(f"Most spacious: {overrides} -> {values}")
@@ -1,6 +1,10 @@
 from dataclasses import dataclass, field, InitVar
 import math
 import copy
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict
 from build123d import *
 from build123d import Shape
 from models.choc import Choc
@@ -18,16 +22,41 @@ from models.model_types import WaveDimensions
 from ocp_vscode import *
 
 from models.outline import Outline
+from part_cache import PartCache, cached_part, part_from_brep, part_to_brep, public_values
+from part_tools import ToolCollector, ToolRegistry, ToolStats
+
+PART_NAMES = ['keywell', 'keyplate', 'bottom']
+
+# the case whose parts are being built, inherited by the forked worker processes
+worker: Dict[str, Any] = {}
+
+def build_part_in_worker(name: str, left: bytes | None = None) -> tuple[bytes, Dict[str, ToolStats]]:
+    """Build a part of worker['case'], see WaveCase.build_part. Parts travel between processes as BREP,
+    together with the tool stats of just this part."""
+    case = worker['case']
+    # the tools stay built, only the counting starts over for every part
+    case.shared_tools.stats = {}
+    part = case.build_part(name, None if left is None else part_from_brep(left))
+    return part_to_brep(part), case.shared_tools.stats
 
 
 class WaveCase:
-    def __init__(self, switch: Switch, keys: ErgoKeys, caseDimensions: WaveDimensions, outline, debug=False, both_sides=False):
+    def __init__(self, switch: Switch, keys: ErgoKeys, caseDimensions: WaveDimensions, outline, debug=False, both_sides=False, parallel=False, processes: int | None = None, part_cache: PartCache | None = None, batch_booleans=True):
+        """parallel builds keywell, keyplate and bottom (and their mirrored versions) in separate
+        processes. It needs the fork start method, and the parts' debug sketches stay in the workers.
+        So do the shared tools: every worker builds the ones it needs, only their stats are merged.
+        With a part_cache, parts whose inputs didn't change are loaded instead of built; they come
+        without debug sketches, too. batch_booleans applies the cuts and additions of a part in as few
+        booleans as possible, see part_tools.ToolCollector."""
         self.switch = switch
         self.keys = keys
 
         self.dims = caseDimensions
         self.outline = outline
         self.bumper = RubberBumper()
+        self.part_cache = part_cache
+        self.batch_booleans = batch_booleans
+        self.shared_tools = ToolRegistry()
 
         self.debug_content: list = []
 
@@ -40,9 +69,11 @@ class WaveCase:
         self.create_accessories()
         
         xiao_plane = Plane.XY
-        xiao_plane = xiao_plane.rotated((180,0,0)).move(Location(self.dims.xiao_position))
-        xiao_mirrored_plane = xiao_plane.rotated((180,0,0)).move(Location(self.dims.xiao_mirror_position))
-        self.xiao = Xiao(xiao_plane, clearance=self.dims.clearance)
+        self.xiao_plane = xiao_plane.rotated((180,0,0)).move(Location(self.dims.xiao_position))
+        self.xiao_mirrored_plane = self.xiao_plane.rotated((180,0,0)).move(Location(self.dims.xiao_mirror_position))
+        self.xiao = Xiao(self.xiao_plane, clearance=self.dims.clearance)
+        self.xiao.part_cache = part_cache
+        self.xiao.tools = self.shared_tools
 
         accessories = []
         accessories.append({"chocs": self.switches})
@@ -73,45 +104,117 @@ class WaveCase:
 
         push_object(accessories, name="accessories")
 
-        self.keywell_left = self.create_keywell()
-        self.keywell_left = self.xiao.add_usb_cutouts(self.keywell_left)
-        push_object(self.keywell_left, name="keywell_left") if self.debug else None
+        sides = ['left', 'right'] if both_sides else ['left']
+        parts = self.build_parts_in_parallel(both_sides, processes) if parallel else self.build_parts(both_sides)
+        for side in sides:
+            for name in PART_NAMES:
+                setattr(self, f"{name}_{side}", parts[f"{name}_{side}"])
+                push_object(parts[f"{name}_{side}"], name=f"{name}_{side}") if self.debug else None
 
-        self.keyplate_left = self.create_keyplate()
-        self.keyplate_left = self.xiao.add_large_usb_cutouts(self.keyplate_left)
-        push_object(self.keyplate_left, name="keyplate_left") if self.debug else None
+        if self.shared_tools.stats:
+            print("Shared tools:")
+            print(self.shared_tools.report())
 
-        self.bottom_left = self.create_bottom()
-        self.bottom_left = self.xiao.add_large_usb_cutouts(self.bottom_left)
-        self.bottom_left = self.xiao.add_reset_lever(
-            self.bottom_left, xiao_plane.offset(self.dims.keyplate_z + self.dims.bottom_plate_z + self.dims.xiao_position.Z)) 
-        push_object(self.bottom_left, name="bottom_left") if self.debug else None
+        if both_sides:
+            accessories.append({"chocs_right": mirror(self.switches, about=Plane.YZ)})
+            accessories.append({"xiao_right": Xiao(self.xiao_mirrored_plane).model})
+            accessories.append({"bumpers_right": mirror(self.bumpers, about=Plane.YZ)})
+        print("Done creating case.")
 
+    def build_part(self, name: str, left: Part | None = None) -> Part:
+        """One of PART_NAMES including its Xiao cutouts. Without a left part this builds the left side,
+        otherwise the right side by mirroring the given left part."""
+        if name == 'keywell':
+            part = self.create_keywell() if left is None else mirror(left, about=Plane.YZ)
+            return self.xiao.add_usb_cutouts(part)
+        if name == 'keyplate':
+            part = self.create_keyplate() if left is None else mirror(left, about=Plane.YZ)
+            return self.xiao.add_large_usb_cutouts(part)
+        if name == 'bottom':
+            part = self.create_bottom() if left is None else mirror(left, about=Plane.YZ)
+            part = self.xiao.add_large_usb_cutouts(part)
+            plane = self.xiao_plane if left is None else self.xiao_mirrored_plane
+            return self.xiao.add_reset_lever(part, plane.offset(self.dims.keyplate_z + self.dims.bottom_plate_z + self.dims.xiao_position.Z))
+        raise ValueError(f"Unknown part '{name}', expected one of {PART_NAMES}")
+
+    def build_parts(self, both_sides: bool) -> Dict[str, Part]:
+        parts = {f"{name}_left": self.build_part(name) for name in PART_NAMES}
         if both_sides:
-            self.keywell_right = mirror(self.keywell_left, about=Plane.YZ)
-            self.keywell_right = self.xiao.add_usb_cutouts(self.keywell_right)
-            push_object(self.keywell_right, name="keywell_right") if self.debug else None
+            parts.update({f"{name}_right": self.build_part(name, parts[f"{name}_left"]) for name in PART_NAMES})
+        return parts
+
+    def build_parts_in_parallel(self, both_sides: bool, processes: int | None) -> Dict[str, Part]:
+        """Like build_parts, with one worker process per part. A right side starts as soon as its left side is done."""
+        worker['case'] = self
+        processes = processes or min(len(PART_NAMES) * (2 if both_sides else 1), os.cpu_count() or 1)
+        serialized = {}
+        try:
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('fork')) as pool:
+                pending = {pool.submit(build_part_in_worker, name): f"{name}_left" for name in PART_NAMES}
+                while pending:
+                    for future in as_completed(list(pending)):
+                        key = pending.pop(future)
+                        serialized[key], stats = future.result()
+                        self.shared_tools.merge(stats)
+                        name, side = key.rsplit('_', 1)
+                        if both_sides and side == 'left':
+                            pending[pool.submit(build_part_in_worker, name, serialized[key])] = f"{name}_right"
+        finally:
+            worker.clear()
+        return {key: part_from_brep(data) for key, data in serialized.items()}
+
+    def cache_inputs(self) -> Dict[str, Any]:
+        """What the parts depend on besides self.dims, see part_cache.cached_part."""
+        return {
+            'switch': public_values(self.switch),
+            'keys': self.keys.keys,
+            'outline': public_values(self.outline),
+            'bumper': self.bumper.dims,
+            'batch_booleans': self.batch_booleans,
+        }
+
+    def create_pin_hole(self) -> Part:
+        """The hole for the pin that holds keywell, keyplate and bottom together."""
+        with BuildPart(mode=Mode.PRIVATE) as pin_hole:
+            with BuildSketch(self.dims.pin_plane):
+                Circle(self.dims.pin_radius)
+            extrude(amount=Pin.dims.length)
+        return pin_hole.part
 
-            self.keyplate_right = mirror(self.keyplate_left, about=Plane.YZ)
-            self.keyplate_right = self.xiao.add_large_usb_cutouts(self.keyplate_right)
-            push_object(self.keyplate_right, name="keyplate_right") if self.debug else None
+    def create_key_holes(self) -> Part:
+        """Switch holes in the keyplate, tight where the switches clamp and with some space below."""
+        with BuildPart(mode=Mode.PRIVATE) as key_holes:
+            with BuildSketch() as key_sketch:
+                for key in self.keys.keys:
+                    with Locations(key.p):
+                        Rectangle(self.switch.below.d.X + self.dims.clearance, self.switch.below.d.Y + self.dims.clearance, rotation=key.r)
+            extrude(amount=-self.switch.clamp_clearance_z)
 
-            self.bottom_right = mirror(self.bottom_left, about=Plane.YZ)
-            self.bottom_right = self.xiao.add_large_usb_cutouts(self.bottom_right)
-            self.bottom_right = self.xiao.add_reset_lever(
-                self.bottom_right, xiao_mirrored_plane.offset(self.dims.keyplate_z + self.dims.bottom_plate_z + self.dims.xiao_position.Z))
-            push_object(self.bottom_right, name="bottom_right") if self.debug else None
+            with BuildSketch(Plane.XY.offset(-self.switch.clamp_clearance_z)):
+                offset(key_sketch.sketch, 0.5)
+            extrude(amount=-self.dims.below_z)
+        return key_holes.part
 
-            accessories.append({"chocs_right": mirror(self.switches, about=Plane.YZ)})
-            accessories.append({"xiao_right": Xiao(xiao_mirrored_plane).model})
-            accessories.append({"bumpers_right": mirror(self.bumpers, about=Plane.YZ)})
-        print("Done creating case.")
+    def create_switch_post_holes(self) -> Part:
+        """Holes in the bottom for the center posts of the switches."""
+        with BuildPart(mode=Mode.PRIVATE) as post_holes:
+            with BuildSketch(Plane.XY.offset(-self.switch.below.d.Z)):
+                for key in self.keys.keys:
+                    with Locations(key.p):
+                        for post in [self.switch.posts.center]:
+                            with BuildSketch(mode=Mode.PRIVATE) as choc_post_sketch:
+                                with Locations(post.p):
+                                    Circle(post.d.radius + 0.1)
+                            add(choc_post_sketch.sketch.mirror(Plane.XZ).rotate(Axis.Z, key.r))
+            extrude(amount=self.switch.posts.center.d.Z)
+        return post_holes.part
 
+    @cached_part
     def create_keyplate(self):
         print("Creating keyplate...")
         debug_content = []
         self.debug_content.append({"keyplate": debug_content}) if self.debug else None
-        with BuildPart() as keyplate:
+        with BuildPart() as keyplate, ToolCollector(keyplate, self.batch_booleans) as tools:
             base=add(self.outline.create_inner_outline(offset_by=-self.dims.wall_thickness - self.dims.clearance))
             extrude(amount=-self.dims.keyplate_z)
             debug_content.append({"base": base}) if self.debug else None
@@ -121,28 +224,21 @@ class WaveCase:
             debug_content.append({"base edges": base.edges()}) if self.debug else None
 
             edges_to_add_clips = self.filter_clip_edges(base.edges())
-            c = self.add_bottom_clips(edges_to_add_clips, clips_on_outside=True, z_position=-self.dims.keyplate_z/2)
+            c = self.add_bottom_clips(edges_to_add_clips, clips_on_outside=True, z_position=-self.dims.keyplate_z/2, tools=tools)
             debug_content.append({"clips": c}) if self.debug else None
 
             print("  key holes...")
-            with BuildSketch() as key_holes:
-                for key in self.keys.keys:
-                    with Locations(key.p):
-                        Rectangle(self.switch.below.d.X + self.dims.clearance, self.switch.below.d.Y + self.dims.clearance, rotation=key.r)
+            key_holes = self.shared_tools.get('key_holes', self.create_key_holes, (self.dims.clearance, self.dims.below_z))
             debug_content.append({"key_holes": key_holes}) if self.debug else None
-            extrude(amount=-self.switch.clamp_clearance_z, mode=Mode.SUBTRACT)
-
-            with BuildSketch(Plane.XY.offset(-self.switch.clamp_clearance_z)) as keyholes_with_space:
-                offset(key_holes.sketch, 0.5)
-            extrude(amount=-self.dims.below_z, mode=Mode.SUBTRACT)
+            tools.collect(key_holes, Mode.SUBTRACT)
 
             print("  xiao hole...")
             with BuildSketch(Plane((self.dims.xiao_position.X, self.dims.xiao_position.Y, 0))) as xiao_hole:
                 Rectangle(Xiao.dims.d.X - 1.5, Xiao.dims.d.Y - 1.5)
-            extrude(amount=self.dims.xiao_position.Z, mode=Mode.SUBTRACT)
+            tools.extrude(amount=self.dims.xiao_position.Z, mode=Mode.SUBTRACT)
             with BuildSketch(Plane(self.dims.xiao_position)) as xiao_cut:
                 Rectangle(Xiao.dims.d.X + 2*self.dims.clearance, Xiao.dims.d.Y + 2*self.dims.clearance)
-            extrude(amount=-self.dims.below_z, mode=Mode.SUBTRACT)
+            tools.extrude(amount=-self.dims.below_z, mode=Mode.SUBTRACT)
 
             print("  connector cut...")
             connector_width: float = 2
@@ -204,7 +300,7 @@ class WaveCase:
                 offset(l, amount=connector_width, side=Side.BOTH)
                 make_face()
 
-            extrude(amount=self.dims.keyplate_z - self.switch.bottom_housing.d.Z, mode=Mode.SUBTRACT)
+            tools.extrude(amount=self.dims.keyplate_z - self.switch.bottom_housing.d.Z, mode=Mode.SUBTRACT)
             debug_content.append({"connector_sketch": connector_sketch}) if self.debug else None
 
             print("  powerswitch...")
@@ -213,7 +309,7 @@ class WaveCase:
                 pin_clearance_y = (PowerSwitch.dims.d.Y + PowerSwitch.dims.pin_length + 10)
                 with Locations((0, pin_clearance_y/2)):
                     Rectangle(PowerSwitch.dims.d.X - 3, pin_clearance_y)
-            extrude(amount=-PowerSwitch.dims.d.Z, mode=Mode.SUBTRACT)
+            tools.extrude(amount=-PowerSwitch.dims.d.Z, mode=Mode.SUBTRACT)
             debug_content.append({"powerswitch_cut": powerswitch_cut}) if self.debug else None
 
             print("  pin extrusion...")
@@ -221,23 +317,23 @@ class WaveCase:
                 with Locations((self.dims.pin_plane.origin.X, 
                                 self.outline.top_left.Y - 1.5*self.dims.wall_thickness - 0.5)):
                     Rectangle(self.dims.wall_thickness*2 + 0.5, self.dims.wall_thickness*3 + 0.5)
-            pin_space =extrude(amount=self.dims.keyplate_z, mode=Mode.SUBTRACT)
+            pin_space = tools.extrude(amount=self.dims.keyplate_z, mode=Mode.SUBTRACT)
             debug_content.append({"pin_space": pin_space}) if self.debug else None
 
             print("  pin holes...")
-            with BuildSketch(self.dims.pin_plane) as pin_holes:
-                Circle(self.dims.pin_radius)
-            debug_content.append({"pin_holes": pin_holes}) if self.debug else None
-            extrude(amount=self.pin.dims.length, mode=Mode.SUBTRACT)
+            pin_hole = self.shared_tools.get('pin_hole', self.create_pin_hole, (self.dims.pin_plane, self.dims.pin_radius))
+            debug_content.append({"pin_holes": pin_hole}) if self.debug else None
+            tools.collect(pin_hole, Mode.SUBTRACT)
 
 
         return keyplate.part
     
+    @cached_part
     def create_keywell(self):
         print("Creating keywell...")
         debug_content = []
         self.debug_content.append({"keywell": debug_content}) if self.debug else None
-        with BuildPart() as keywell:
+        with BuildPart() as keywell, ToolCollector(keywell, self.batch_booleans) as tools:
             with BuildSketch(Plane.XY.offset(self.dims.above_z)) as body_sketch:
                 add(self.outline.create_outline())
             body = extrude(amount=-self.dims.below_z - self.dims.above_z)
@@ -248,7 +344,7 @@ class WaveCase:
             print("  keywell cut...")
             keywell_wall = self.outline.create_inner_outline(offset_by=-self.dims.wall_thickness)
             add(keywell_wall)
-            extrude(amount=-self.dims.below_z, mode=Mode.SUBTRACT)
+            tools.extrude(amount=-self.dims.below_z, mode=Mode.SUBTRACT)
 
             print("  skulpting thumb cut...")
             debug_thumb_content = []
@@ -275,7 +371,8 @@ class WaveCase:
                                 Rectangle(x, y)
 
             debug_thumb_content.append({"sketch": thumb_cut_sketch}) if self.debug else None
-            thumb_cut=extrude(amount=thumb_x_from_top, mode=Mode.SUBTRACT, taper=-taper)
+            thumb_cut = tools.extrude(amount=thumb_x_from_top, mode=Mode.SUBTRACT, taper=-taper)
+            tools.flush()
 
             # every face thats not top or bottom
             outside = [f for f in body.faces() if f not in body.faces().filter_by(Axis.Z)]
@@ -286,30 +383,29 @@ class WaveCase:
             
             with BuildSketch(Plane.XY.offset(self.dims.above_z)) as key_cut_sketch:
                 add(self.outline.create_keywell_outline())
-            extrude(to_extrude=key_cut_sketch.sketch, amount=-self.dims.below_z - self.dims.above_z, mode=Mode.SUBTRACT)
+            tools.extrude(to_extrude=key_cut_sketch.sketch, amount=-self.dims.below_z - self.dims.above_z, mode=Mode.SUBTRACT)
 
             print("  clips...")
             edges_to_add_clips = self.filter_clip_edges(keywell_wall.edges())
             long_clips, short_clips = self.split_off_clips_that_should_be_longer(edges_to_add_clips)
-            c = self.add_bottom_clips(long_clips, clips_on_outside=False, z_position=self.dims.clip_lower_z, extralong=True)
+            c = self.add_bottom_clips(long_clips, clips_on_outside=False, z_position=self.dims.clip_lower_z, extralong=True, tools=tools)
             debug_content.append({"bottom long clips": c}) if self.debug else None
-            c = self.add_bottom_clips(short_clips, clips_on_outside=False, z_position=self.dims.clip_lower_z)
+            c = self.add_bottom_clips(short_clips, clips_on_outside=False, z_position=self.dims.clip_lower_z, tools=tools)
             debug_content.append({"bottom short clips": c}) if self.debug else None
-            c = self.add_bottom_clips(edges_to_add_clips, clips_on_outside=False, z_position=self.dims.clip_upper_z)
+            c = self.add_bottom_clips(edges_to_add_clips, clips_on_outside=False, z_position=self.dims.clip_upper_z, tools=tools)
             debug_content.append({"keyplate clips": c}) if self.debug else None
 
             print("  pin holes...")
-            with BuildSketch(self.dims.pin_plane) as pin_holes:
-                Circle(self.dims.pin_radius)
-            debug_content.append({"pin_holes": pin_holes}) if self.debug else None
-            extrude(amount=self.pin.dims.length, mode=Mode.SUBTRACT)
+            pin_hole = self.shared_tools.get('pin_hole', self.create_pin_hole, (self.dims.pin_plane, self.dims.pin_radius))
+            debug_content.append({"pin_holes": pin_hole}) if self.debug else None
+            tools.collect(pin_hole, Mode.SUBTRACT)
 
             print("  battery recess...")
             battery_pd = self.dims.battery_pd
             with BuildSketch(Plane.XY.offset(battery_pd.p.Z)) as battery_sketch:
                 with Locations((battery_pd.p.X, battery_pd.p.Y)):
                     Rectangle(battery_pd.d.X + 2*self.dims.clearance, battery_pd.d.Y + 2*self.dims.clearance)
-            extrude(amount=-battery_pd.d.Z - self.dims.wall_thickness, mode=Mode.SUBTRACT)
+            tools.extrude(amount=-battery_pd.d.Z - self.dims.wall_thickness, mode=Mode.SUBTRACT)
             debug_content.append({"battery_sketch": battery_sketch}) if self.debug else None
 
             if self.dims.magnet_positions:
@@ -317,7 +413,7 @@ class WaveCase:
                 with BuildSketch(Plane.XY.offset(self.dims.magnet_positions[0].Z)) as magnet_sketch:
                     with Locations(self.dims.magnet_positions):
                         Circle(self.dims.magnet_d.radius + self.dims.clearance)
-                extrude(amount=-self.dims.above_z - self.dims.magnet_d.Z - 0.5, mode=Mode.SUBTRACT)
+                tools.extrude(amount=-self.dims.above_z - self.dims.magnet_d.Z - 0.5, mode=Mode.SUBTRACT)
                 debug_content.append({"magnet_sketch": magnet_sketch}) if self.debug else None
 
             if self.dims.weight_positions:
@@ -325,7 +421,7 @@ class WaveCase:
                 with BuildSketch(Plane.XY.offset(self.dims.weight_positions[0].Z)) as weight_sketch:
                     with Locations(self.dims.weight_positions):
                         Rectangle(self.dims.weight_d.X + 2*self.dims.clearance, self.dims.weight_d.Y + 2*self.dims.clearance)
-                extrude(amount=-self.dims.above_z - self.dims.weight_d.Z, mode=Mode.SUBTRACT)
+                tools.extrude(amount=-self.dims.above_z - self.dims.weight_d.Z, mode=Mode.SUBTRACT)
                 debug_content.append({"weight_sketch": weight_sketch}) if self.debug else None
 
             print("  symbol...")
@@ -333,7 +429,7 @@ class WaveCase:
                 symbol_height = 20
                 with Locations(self.outline.top_left + Vector(0.65*symbol_height, -0.6*symbol_height)):
                     add(Symbol(total_height=symbol_height).sketch)
-            extrude(amount=-0.5, mode=Mode.SUBTRACT)
+            tools.extrude(amount=-0.5, mode=Mode.SUBTRACT)
             debug_content.append({"symbol_sketch": symbol_sketch}) if self.debug else None
 
         return keywell.part
@@ -365,9 +461,10 @@ class WaveCase:
             .filter_by(lambda e: e.length > 5)
         return filtered_edges
 
-    def add_bottom_clips(self, edges: ShapeList[Edge] | Edge, clips_on_outside: bool = False, z_position: float = 0, extralong=False) -> list[Sketch]:
+    def add_bottom_clips(self, edges: ShapeList[Edge] | Edge, clips_on_outside: bool = False, z_position: float = 0, extralong=False, tools: ToolCollector | None = None) -> list[Sketch]:
         if isinstance(edges, Edge):
             edges = ShapeList([edges])
+        tools = tools or ToolCollector(None, enabled=False)
         clips = []
         for e in edges:
             edge_center = e.center()
@@ -393,18 +490,23 @@ class WaveCase:
             dir = -1 if clips_on_outside else 1
             mode = Mode.ADD if clips_on_outside else Mode.SUBTRACT
             taper = 5 if extralong else 0
-            extrude(to_extrude=clip, amount=dir*total_protrusion, mode=mode, taper=dir*taper)
-            if clips_on_outside:
-                fillet(clip.edges(), radius=self.dims.clip_protusion - 0.2)
+            tools.extrude(to_extrude=clip, amount=dir*total_protrusion, mode=mode, taper=dir*taper)
             clips.append(clip)
+
+        if clips_on_outside:
+            # the clips don't touch each other, so they can all be added before rounding them
+            tools.flush()
+            for clip in clips:
+                fillet(clip.edges(), radius=self.dims.clip_protusion - 0.2)
         return clips
 
 
+    @cached_part
     def create_bottom(self):
         print("Creating bottom...")
         debug_content = []
         self.debug_content.append({"bottom": debug_content}) if self.debug else None
-        with BuildPart() as bottom:
+        with BuildPart() as bottom, ToolCollector(bottom, self.batch_booleans) as tools:
             outline = self.outline.create_inner_outline(offset_by=-self.dims.wall_thickness - self.dims.clearance)
             
             with BuildSketch(Plane.XY.offset(-self.dims.below_z)) as base:
@@ -414,51 +516,45 @@ class WaveCase:
 
             edges_to_add_clips = self.filter_clip_edges(base.edges())
             long_clips, short_clips = self.split_off_clips_that_should_be_longer(edges_to_add_clips)
-            c = self.add_bottom_clips(long_clips, clips_on_outside=True, z_position=self.dims.clip_lower_z, extralong=True)
+            c = self.add_bottom_clips(long_clips, clips_on_outside=True, z_position=self.dims.clip_lower_z, extralong=True, tools=tools)
             debug_content.append({"long clips": c}) if self.debug else None
-            c = self.add_bottom_clips(short_clips, clips_on_outside=True, z_position=self.dims.clip_lower_z)
+            c = self.add_bottom_clips(short_clips, clips_on_outside=True, z_position=self.dims.clip_lower_z, tools=tools)
             debug_content.append({"short clips": c}) if self.debug else None
 
             print("  xiao support...")
             with BuildSketch(Plane.XY.offset(self.dims.xiao_position.Z)) as xiao_support:
                 with Locations((self.dims.xiao_position.X, self.dims.xiao_position.Y - Xiao.processor.forward_y)):
                     Rectangle(Xiao.processor.d.X + 0.5, Xiao.processor.d.Y + 0.5)
-            extrude(amount=-(Xiao.dims.d.Z + Xiao.processor.d.Z + self.dims.clearance) , mode=Mode.SUBTRACT)
+            tools.extrude(amount=-(Xiao.dims.d.Z + Xiao.processor.d.Z + self.dims.clearance), mode=Mode.SUBTRACT)
             debug_content.append({"xiao support": xiao_support}) if self.debug else None
             with BuildSketch(Plane.XY.offset(self.dims.xiao_position.Z)) as xiao_cutout:
                 with Locations((self.dims.xiao_position.X, self.dims.xiao_position.Y - Xiao.processor.forward_y)):
                     Rectangle(Xiao.dims.d.X - 0.5, Xiao.dims.d.Y - Xiao.processor.forward_y*2 +4)
-            extrude(amount=-(Xiao.dims.d.Z + Xiao.processor.d.Z/2) , mode=Mode.SUBTRACT)
+            tools.extrude(amount=-(Xiao.dims.d.Z + Xiao.processor.d.Z/2), mode=Mode.SUBTRACT)
             debug_content.append({"xiao xiao_cutout": xiao_cutout}) if self.debug else None
 
             print("  bumper cutouts...")
             with BuildSketch(Plane.XY.offset(-self.dims.below_z)):
                 with Locations(self.dims.bumper_locations):
                     Circle(self.bumper.dims.radius)
-            extrude(amount=self.bumper.dims.base_z, mode=Mode.SUBTRACT)
+            tools.extrude(amount=self.bumper.dims.base_z, mode=Mode.SUBTRACT)
 
             print("  switch post cutouts")
-            with BuildSketch(Plane.XY.offset(-self.switch.below.d.Z)) as choc_posts:
-                for key in self.keys.keys:
-                    with Locations(key.p):
-                        for post in [self.switch.posts.center]:
-                            with BuildSketch(mode=Mode.PRIVATE) as choc_post_sketch:
-                                with Locations(post.p):
-                                    Circle(post.d.radius + 0.1)
-                            add(choc_post_sketch.sketch.mirror(Plane.XZ).rotate(Axis.Z, key.r))
-            extrude(amount=self.switch.posts.center.d.Z, mode=Mode.SUBTRACT)
+            choc_posts = self.shared_tools.get('switch_post_holes', self.create_switch_post_holes)
+            tools.collect(choc_posts, Mode.SUBTRACT)
             debug_content.append({"chocs posts": choc_posts}) if self.debug else None
 
             with BuildSketch(Plane(self.dims.powerswitch_position).rotated(self.dims.powerswitch_rotation)) as powerswitch_cut:
                 with Locations((0, PowerSwitch.dims.pin_length/2)):
                     Rectangle(PowerSwitch.dims.d.X + 1, PowerSwitch.dims.d.Y + 1 + PowerSwitch.dims.pin_length)
-            extrude(amount=-10, mode=Mode.SUBTRACT)
+            tools.extrude(amount=-10, mode=Mode.SUBTRACT)
 
             with BuildSketch(Plane(self.dims.powerswitch_position).rotated(self.dims.powerswitch_rotation)) as powerswitch_lever_cut_sketch:
                 with Locations(-PowerSwitch.lever.p):
                     RectangleRounded(PowerSwitch.lever.clearance + 0.5, PowerSwitch.lever.d.Y +0.5, radius=0.5)
-            powerswitch_lever_cut = extrude(amount=self.dims.powerswitch_position.Z + self.dims.below_z, mode=Mode.SUBTRACT)
+            powerswitch_lever_cut = tools.extrude(amount=self.dims.powerswitch_position.Z + self.dims.below_z, mode=Mode.SUBTRACT)
             debug_content.append({"powerswitch_lever_cut": powerswitch_lever_cut}) if self.debug else None  
+            tools.flush()
             chamfer(powerswitch_lever_cut.edges().group_by(Axis.Z)[0], length=1.5, length2=0.5)
 
             print("  pin extrusion...")
@@ -466,15 +562,15 @@ class WaveCase:
                 with Locations((self.dims.pin_x, 
                                 self.outline.top_left.Y - self.dims.wall_thickness*2 - 0.5)):
                     Rectangle(self.dims.wall_thickness*2, self.dims.wall_thickness*2)
-            pin_space =extrude(amount=self.dims.keyplate_z, taper=2)
+            pin_space = tools.extrude(amount=self.dims.keyplate_z, taper=2)
+            tools.flush()
             fillet(pin_space.edges(), radius=0.3 - self.dims.clearance)
             debug_content.append({"pin_space": pin_space}) if self.debug else None
 
             print("  pin holes...")
-            with BuildSketch(self.dims.pin_plane) as pin_holes:
-                Circle(self.dims.pin_radius)
-            debug_content.append({"pin_holes": pin_holes}) if self.debug else None
-            extrude(amount=self.pin.dims.length, mode=Mode.SUBTRACT)
+            pin_hole = self.shared_tools.get('pin_hole', self.create_pin_hole, (self.dims.pin_plane, self.dims.pin_radius))
+            debug_content.append({"pin_holes": pin_hole}) if self.debug else None
+            tools.collect(pin_hole, Mode.SUBTRACT)
 
             print("  space invader...")
             if self.dims.space_invader is not None:
@@ -482,7 +578,7 @@ class WaveCase:
                     invader_height = 10
                     with Locations(self.dims.space_invader):
                         add(SpaceInvader(total_height=invader_height).sketch)
-                extrude(amount=0.5, mode=Mode.SUBTRACT)
+                tools.extrude(amount=0.5, mode=Mode.SUBTRACT)
                 debug_content.append({"invader_sketch": invader_sketch}) if self.debug else None
 
         return bottom.part